@@ -0,0 +1,126 @@
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import telegram  # noqa: E402
+from telegram.utils.request import Request  # noqa: E402
+
+import homework  # noqa: E402
+import http_session  # noqa: E402
+from dedup import DedupCache  # noqa: E402
+from scheduler import FixedScheduler  # noqa: E402
+from standins import (PracticumHandler, StandIn,  # noqa: E402
+                      TelegramHandler)
+
+
+def percentile(values, fraction):
+    """Возвращает перцентиль выборки."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_user(bot, user, cycles):
+    """Выполняет циклы опроса пользователя и возвращает их длительности."""
+    headers = homework.make_headers(f'token-{user}')
+    last_send = DedupCache()
+    scheduler = FixedScheduler()
+    timestamp = 0
+    durations = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        timestamp = homework.poll_homeworks(
+            bot, user, headers, timestamp, last_send, scheduler
+        )
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def run(args):
+    practicum = StandIn(
+        PracticumHandler, latency=args.api_latency,
+        error_rate=args.api_error_rate, payload_size=args.payload_size
+    )
+    telegram_api = StandIn(
+        TelegramHandler, latency=args.telegram_latency,
+        error_rate=args.telegram_error_rate
+    )
+    with practicum, telegram_api:
+        homework.ENDPOINT = f'{practicum.url}/api/user_api/homework_statuses/'
+        http_session.configure(pool_size=args.concurrency, retries=0)
+        homework.api_limiter = homework.make_api_limiter(
+            rate=args.api_rate, burst=args.api_rate
+        )
+        bot = telegram.Bot(
+            token='1234:benchmark', base_url=f'{telegram_api.url}/bot',
+            request=Request(con_pool_size=args.concurrency)
+        )
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(
+                lambda user: run_user(bot, user, args.cycles),
+                range(args.users)
+            ))
+        elapsed = time.perf_counter() - start
+        http_session.close()
+        polls = practicum.requests
+        messages = telegram_api.requests
+    durations = [duration for user in results for duration in user]
+    return {
+        'users': args.users,
+        'cycles': args.cycles,
+        'concurrency': args.concurrency,
+        'payload_size': args.payload_size,
+        'api_latency': args.api_latency,
+        'api_error_rate': args.api_error_rate,
+        'telegram_latency': args.telegram_latency,
+        'telegram_error_rate': args.telegram_error_rate,
+        'elapsed_s': elapsed,
+        'polls_per_s': polls / elapsed,
+        'messages_per_s': messages / elapsed,
+        'cycle_p50_ms': percentile(durations, 0.5) * 1000,
+        'cycle_p99_ms': percentile(durations, 0.99) * 1000,
+        'cycle_mean_ms': statistics.mean(durations) * 1000,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Нагрузочный прогон бота на локальных заглушках API.'
+    )
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--payload-size', type=int, default=5)
+    parser.add_argument('--api-latency', type=float, default=0.01)
+    parser.add_argument('--api-error-rate', type=float, default=0.0)
+    parser.add_argument('--telegram-latency', type=float, default=0.01)
+    parser.add_argument('--telegram-error-rate', type=float, default=0.0)
+    parser.add_argument(
+        '--api-rate', type=float, default=1e6,
+        help='лимит запросов к API в секунду, по умолчанию без ограничения'
+    )
+    parser.add_argument(
+        '--output', help='файл, в который дописывается результат (JSONL)'
+    )
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    result = run(args)
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+
+
+if __name__ == '__main__':
+    main()
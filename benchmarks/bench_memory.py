@@ -0,0 +1,111 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework import HOMEWORK_VERDICTS, parse_homeworks  # noqa: E402
+
+
+def make_payloads(users, homeworks):
+    """Возвращает тела ответов API (JSON) для `users` пользователей."""
+    statuses = list(HOMEWORK_VERDICTS)
+    return [
+        json.dumps({
+            'current_date': 1650000000,
+            'homeworks': [
+                {
+                    'id': user * homeworks + number,
+                    'homework_name': f'student{user}__hw{number}.zip',
+                    'status': statuses[number % len(statuses)],
+                    'reviewer_comment': 'Всё нравится',
+                    'date_updated': '2022-04-15T10:00:00Z',
+                    'lesson_name': 'Итоговый проект',
+                }
+                for number in range(homeworks)
+            ],
+        }, ensure_ascii=False)
+        for user in range(users)
+    ]
+
+
+def as_dicts(payload):
+    return json.loads(payload)['homeworks']
+
+
+def as_records(payload):
+    return list(parse_homeworks(json.loads(payload)['homeworks']))
+
+
+def retained(load, payloads):
+    """Возвращает удерживаемую память (байт) и загруженные работы."""
+    gc.collect()
+    tracemalloc.start()
+    snapshots = [load(payload) for payload in payloads]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, snapshots
+
+
+def access_time(snapshots, field):
+    """Лучшее время чтения названия и статуса у всех работ."""
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        for homeworks in snapshots:
+            for homework in homeworks:
+                field(homework)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(args):
+    payloads = make_payloads(args.users, args.homeworks)
+    dict_bytes, dicts = retained(as_dicts, payloads)
+    dict_access = access_time(
+        dicts, lambda homework: (homework['homework_name'], homework['status'])
+    )
+    del dicts
+    record_bytes, records = retained(as_records, payloads)
+    record_access = access_time(
+        records, lambda homework: (homework.name, homework.status)
+    )
+    count = args.users * args.homeworks
+    return {
+        'users': args.users,
+        'homeworks_per_user': args.homeworks,
+        'dict_bytes_per_homework': dict_bytes / count,
+        'record_bytes_per_homework': record_bytes / count,
+        'memory_ratio': dict_bytes / record_bytes,
+        'dict_access_ns': dict_access / count * 1e9,
+        'record_access_ns': record_access / count * 1e9,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Сравнивает память и скорость доступа к полям '
+                    'работ в словарях из JSON и в записях Homework.'
+    )
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument(
+        '--homeworks', type=int, default=20,
+        help='число работ в ответе для каждого пользователя'
+    )
+    parser.add_argument(
+        '--output', help='файл, в который дописывается результат (JSONL)'
+    )
+    args = parser.parse_args()
+    line = json.dumps(run(args), sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+
+
+if __name__ == '__main__':
+    main()
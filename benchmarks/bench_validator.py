@@ -0,0 +1,95 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework import (HOMEWORK_VERDICTS, check_homeworks,  # noqa: E402
+                      check_response)
+
+
+def legacy_check_response(response):
+    """Проверка ответа до перехода на скомпилированную схему."""
+    if not response:
+        raise KeyError('Empty dictionary')
+    if not isinstance(response, dict):
+        raise TypeError(
+            'Wrong type response.'
+            f'Should have come dict but came {type(response)}'
+        )
+    if 'homeworks' not in response:
+        raise KeyError('Key homeworks missing')
+    homeworks_response = response['homeworks']
+    if not isinstance(homeworks_response, list):
+        raise TypeError(
+            'Wrong type homeworks.'
+            f'Should have come list but came {type(homeworks_response)}'
+        )
+    return homeworks_response
+
+
+def legacy_check_homework(homework):
+    """Проверки parse_status до перехода на скомпилированную схему."""
+    if 'homework_name' not in homework:
+        raise KeyError('Missing key \'homework_name\'.')
+    if 'status' not in homework:
+        raise KeyError('Missing key status.')
+    if homework['status'] not in HOMEWORK_VERDICTS:
+        raise KeyError(f'{homework["status"]} not among the possible')
+
+
+def legacy(response):
+    for homework in legacy_check_response(response):
+        legacy_check_homework(homework)
+
+
+def compiled(response):
+    """Проверка ответа в цикле опроса: check_response и check_homeworks."""
+    check_homeworks(check_response(response))
+
+
+def make_response(records):
+    statuses = list(HOMEWORK_VERDICTS)
+    return {
+        'current_date': 1650000000,
+        'homeworks': [
+            {
+                'id': number,
+                'homework_name': f'student__hw{number}.zip',
+                'status': statuses[number % len(statuses)],
+                'reviewer_comment': 'Всё нравится',
+                'date_updated': '2022-04-15T10:00:00Z',
+                'lesson_name': 'Итоговый проект',
+            }
+            for number in range(records)
+        ],
+    }
+
+
+def measure(function, response, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(response)
+        best = min(best, time.perf_counter() - start)
+    return len(response['homeworks']) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Сравнивает скорость проверки ответа API.'
+    )
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    response = make_response(args.records)
+    before = measure(legacy, response, args.repeat)
+    after = measure(compiled, response, args.repeat)
+    print(f'legacy checks:     {before:14,.0f} records/s')
+    print(f'compiled validator: {after:13,.0f} records/s')
+    print(f'speedup:            {after / before:13.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+from dedup import DedupCache  # noqa: E402
+from error_digest import ErrorDigest  # noqa: E402
+from recording import read_records  # noqa: E402
+from scheduler import FixedScheduler  # noqa: E402
+
+
+class StubBot:
+    """Бот, запоминающий число отправленных сообщений."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_message(self, chat_id, text):
+        self.sent += 1
+
+
+def replay(records, bot):
+    """Прогоняет записанные ответы API через цикл опроса.
+
+    Каждый ответ обрабатывает `homework.poll_homeworks`, которому
+    вместо запроса к API передан записанный ответ; уведомления
+    и сообщения об ошибках уходят в `bot`.
+    """
+    homework.error_digest = ErrorDigest()
+    subscriptions = {}
+    for record in records:
+        user = record['user']
+        if user not in subscriptions:
+            subscriptions[user] = (
+                record['from_date'], DedupCache(), FixedScheduler()
+            )
+        timestamp, last_send, scheduler = subscriptions[user]
+        response = record['response']
+        timestamp = homework.poll_homeworks(
+            bot, user, {}, timestamp, last_send, scheduler,
+            fetch=lambda *args: response
+        )
+        subscriptions[user] = timestamp, last_send, scheduler
+
+
+def count_homeworks(records):
+    """Считает работы в записанных ответах."""
+    return sum(
+        len(record['response']['homeworks']) for record in records
+        if isinstance(record['response'], dict)
+        and isinstance(record['response'].get('homeworks'), list)
+    )
+
+
+def run(args):
+    records = list(read_records(args.path))
+    answers = [record for record in records if record['kind'] == 'api']
+    recorded = sum(record['kind'] == 'send' for record in records)
+    bot = StubBot()
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        replay(answers, bot)
+    elapsed = time.perf_counter() - start
+    homeworks = count_homeworks(answers) * args.repeat
+    responses = len(answers) * args.repeat
+    return {
+        'responses': len(answers),
+        'repeat': args.repeat,
+        'elapsed_s': elapsed,
+        'responses_per_s': responses / elapsed if elapsed else None,
+        'homeworks_per_s': homeworks / elapsed if elapsed else None,
+        'messages': bot.sent // args.repeat,
+        'recorded_messages': recorded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Прогон записанного трафика через разбор ответов API.'
+    )
+    parser.add_argument(
+        'path', help='журнал, записанный с RECORD_FILE (JSONL или .gz)'
+    )
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument(
+        '--output', help='файл, в который дописывается результат (JSONL)'
+    )
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    line = json.dumps(run(args), sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+
+
+if __name__ == '__main__':
+    main()
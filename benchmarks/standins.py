@@ -0,0 +1,112 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STATUSES = ('reviewing', 'approved', 'rejected')
+
+
+class StandIn:
+    """Локальный HTTP-сервер с настраиваемыми задержкой и ошибками."""
+
+    def __init__(self, handler, latency=0.0, error_rate=0.0, **options):
+        attributes = dict(
+            options, latency=latency, error_rate=error_rate, requests=0,
+            lock=threading.Lock()
+        )
+        handler_class = type(handler.__name__, (handler,), attributes)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+        self.server.daemon_threads = True
+        self.handler = handler_class
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    @property
+    def requests(self):
+        return self.handler.requests
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Общая часть обработчиков: учёт запросов, задержка и сбои."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def begin(self):
+        with self.lock:
+            type(self).requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            self.reply(500, {'error': 'stand-in failure'})
+            return False
+        return True
+
+    def reply(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PracticumHandler(StandInHandler):
+    """Заменяет эндпоинт homework_statuses API Практикума.
+
+    Возвращает `payload_size` работ со случайными статусами, так что
+    часть опросов приводит к уведомлениям.
+    """
+
+    payload_size = 1
+
+    def do_GET(self):
+        if not self.begin():
+            return
+        self.reply(200, {
+            'current_date': int(time.time()),
+            'homeworks': [
+                {
+                    'id': number,
+                    'homework_name': f'student__hw{number}.zip',
+                    'status': random.choice(STATUSES),
+                    'reviewer_comment': 'Комментарий ревьюера',
+                    'date_updated': '2022-04-15T10:00:00Z',
+                    'lesson_name': 'Урок',
+                }
+                for number in range(self.payload_size)
+            ],
+        })
+
+
+class TelegramHandler(StandInHandler):
+    """Заменяет метод sendMessage Telegram Bot API."""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        if not self.begin():
+            return
+        self.reply(200, {'ok': True, 'result': {
+            'message_id': self.requests,
+            'date': int(time.time()),
+            'chat': {'id': 1, 'type': 'private'},
+            'text': 'ok',
+        }})
@@ -0,0 +1,110 @@
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+from exceptions import CircuitOpenError
+
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', 60))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+
+class CircuitBreaker:
+    """Размыкает цепь к внешнему сервису после серии сбоев.
+
+    В замкнутом состоянии вызовы проходят, а сбои подсчитываются.
+    После `failures` сбоев подряд цепь размыкается и вызовы сразу
+    отклоняются с `CircuitOpenError`. Через `reset_timeout` секунд
+    цепь становится полуоткрытой: пропускается один пробный вызов,
+    его успех замыкает цепь, сбой снова размыкает. Сбоем считается
+    исключение, для которого `is_failure` возвращает True; остальные
+    исключения говорят о том, что сервис отвечает.
+    """
+
+    def __init__(self, name, failures=BREAKER_FAILURES,
+                 reset_timeout=BREAKER_RESET_TIMEOUT,
+                 is_failure=lambda error: True, clock=time.monotonic):
+        self.name = name
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self.clock = clock
+        self.state = CLOSED
+        self.errors = 0
+        self.opened_at = None
+        self.probing = False
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def _switch(self, state):
+        if state != self.state:
+            logging.warning(
+                f'Circuit {self.name} switched {self.state} -> {state}'
+            )
+            self.state = state
+
+    def retry_after(self):
+        """Возвращает, через сколько секунд цепь пропустит пробу."""
+        if self.state == CLOSED:
+            return 0.0
+        if self.state == HALF_OPEN:
+            return self.reset_timeout
+        return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+
+    def allow(self):
+        """Разрешает вызов или поднимает CircuitOpenError."""
+        with self.lock:
+            if self.state == OPEN and self.retry_after() == 0:
+                self._switch(HALF_OPEN)
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return
+            self.rejected += 1
+            raise CircuitOpenError(
+                f'Circuit {self.name} is open',
+                retry_after=self.retry_after()
+            )
+
+    def record(self, error=None):
+        """Учитывает результат разрешённого вызова."""
+        failed = error is not None and self.is_failure(error)
+        with self.lock:
+            self.probing = False
+            if not failed:
+                self.errors = 0
+                self._switch(CLOSED)
+                return
+            self.errors += 1
+            if self.state == HALF_OPEN or self.errors >= self.failures:
+                self.opened_at = self.clock()
+                self._switch(OPEN)
+
+    def call(self, function, *args, **kwargs):
+        """Вызывает функцию через цепь."""
+        self.allow()
+        try:
+            result = function(*args, **kwargs)
+        except Exception as error:
+            self.record(error)
+            raise
+        self.record()
+        return result
+
+    def protect(self, function):
+        """Декоратор, вызывающий функцию через цепь."""
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            return self.call(function, *args, **kwargs)
+        return wrapper
+
+    def state_code(self):
+        """Возвращает номер состояния для метрик."""
+        return STATES.index(self.state)
@@ -0,0 +1,78 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+DEDUP_MAX_BYTES = int(os.getenv('DEDUP_MAX_BYTES', 64 * 1024))
+DEDUP_TTL = float(os.getenv('DEDUP_TTL', 90 * 24 * 60 * 60))
+ENTRY_SIZE = 200
+
+
+def digest(value):
+    """Возвращает 64-битный отпечаток значения."""
+    return int.from_bytes(
+        hashlib.blake2b(repr(value).encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class DedupCache(OrderedDict):
+    """Ограниченная память об отправленном: ключ → 64-битный отпечаток.
+
+    Вместо самих значений хранит их отпечатки. Записи вытесняются
+    по LRU, когда оценка занятой памяти превышает `max_bytes`, и по
+    истечении `ttl` секунд с последнего обращения. Счётчики вытеснений
+    ведутся для каждого экземпляра и суммарно в `DedupCache.totals`.
+    """
+
+    totals = {'lru': 0, 'ttl': 0}
+
+    def __init__(self, items=(), max_bytes=DEDUP_MAX_BYTES, ttl=DEDUP_TTL,
+                 clock=time.monotonic):
+        super().__init__()
+        self.max_entries = max(1, max_bytes // ENTRY_SIZE)
+        self.ttl = ttl
+        self.clock = clock
+        self.touched = {}
+        self.evictions = {'lru': 0, 'ttl': 0}
+        for key, value in dict(items).items():
+            if isinstance(value, int):
+                self._store(key, value)
+
+    def _store(self, key, value):
+        OrderedDict.__setitem__(self, key, value)
+        self.move_to_end(key)
+        self.touched[key] = self.clock()
+
+    def _evict(self, key, reason):
+        OrderedDict.__delitem__(self, key)
+        del self.touched[key]
+        self.evictions[reason] += 1
+        DedupCache.totals[reason] += 1
+
+    def expire(self):
+        """Удаляет записи, к которым не обращались дольше ttl."""
+        deadline = self.clock() - self.ttl
+        while self and self.touched[next(iter(self))] < deadline:
+            self._evict(next(iter(self)), 'ttl')
+
+    def seen(self, key, value):
+        """Проверяет, что для ключа уже запомнено это значение."""
+        self.expire()
+        stored = self.get(key)
+        if stored is None or stored != digest(value):
+            return False
+        self.move_to_end(key)
+        self.touched[key] = self.clock()
+        return True
+
+    def remember(self, key, value):
+        """Запоминает отпечаток значения для ключа."""
+        self._store(key, digest(value))
+        while len(self) > self.max_entries:
+            self._evict(next(iter(self)), 'lru')
+
+    def forget(self, key):
+        """Забывает значение для ключа, если оно было."""
+        if key in self:
+            OrderedDict.__delitem__(self, key)
+            del self.touched[key]
@@ -0,0 +1,331 @@
+import asyncio
+import logging
+import os
+import random
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import telegram
+from dotenv import load_dotenv
+from telegram.utils.request import Request
+
+import http_session
+import metrics
+from dedup import DedupCache
+from homework import (STREAM_RESPONSES, TELEGRAM_TOKEN, fetch_limited,
+                      make_headers, poll_homeworks)
+from lifecycle import (FAST_START_WINDOW, GracefulShutdown,
+                       resume_delay)
+from log_config import configure_logging
+from outbound import OUTBOUND_WORKERS, TELEGRAM_GLOBAL_RATE, OutboundQueue
+from outbox import OUTBOX_PATH, Outbox
+from profiling import CycleProfiler
+from ratelimit import NORMAL, URGENT
+from scheduler import RETRY_TIME, make_scheduler
+from state import StateStore, subscription_key
+
+load_dotenv()
+
+SUBSCRIPTIONS_FILE = os.getenv('SUBSCRIPTIONS_FILE', 'subscriptions.txt')
+POLL_CONCURRENCY = int(os.getenv('POLL_CONCURRENCY', 50))
+
+
+class Subscription:
+    """Подписка Telegram чата на статусы работ по токену Практикума."""
+
+    __slots__ = (
+        'token', 'chat_id', 'key', 'headers', 'timestamp', 'last_send',
+        'scheduler'
+    )
+
+    def __init__(self, token, chat_id, timestamp=None, scheduler=None):
+        self.token = token
+        self.chat_id = chat_id
+        self.key = subscription_key(token, chat_id)
+        self.headers = make_headers(token)
+        self.timestamp = (
+            int(time.time()) if timestamp is None else timestamp
+        )
+        self.last_send = DedupCache()
+        self.scheduler = (
+            make_scheduler() if scheduler is None else scheduler
+        )
+
+    def __repr__(self):
+        return f'Subscription(chat_id={self.chat_id})'
+
+
+def load_subscriptions(path):
+    """Читает подписки из файла формата `<token> <chat_id>` по строке."""
+    subscriptions = []
+    with open(path, encoding='utf-8') as file:
+        for number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split()
+            if len(parts) != 2:
+                raise ValueError(
+                    f'{path}:{number}: expected "<token> <chat_id>"'
+                )
+            subscriptions.append(Subscription(*parts))
+    return subscriptions
+
+
+def group_by_token(subscriptions, stream=STREAM_RESPONSES):
+    """Группирует подписки с общим токеном Практикума.
+
+    Потоковый ответ можно прочитать только один раз, поэтому при
+    `stream` каждая подписка опрашивается отдельно.
+    """
+    groups = {}
+    for subscription in subscriptions:
+        key = subscription.key if stream else subscription.token
+        groups.setdefault(key, []).append(subscription)
+    return list(groups.values())
+
+
+def fetch_group(group):
+    """Запрашивает API один раз для всех подписок одного токена.
+
+    Запрос идёт с наименьшей меткой времени группы, срочным он
+    становится, если срочна хотя бы одна подписка. Возвращает функцию
+    для `poll_homeworks`, отдающую каждой подписке этот ответ или
+    эту ошибку.
+    """
+    timestamp = min(subscription.timestamp for subscription in group)
+    urgent = any(subscription.scheduler.urgent() for subscription in group)
+    try:
+        response = fetch_limited(
+            timestamp, group[0].headers, URGENT if urgent else NORMAL
+        )
+    except Exception as error:
+        failure = error
+
+        def fetch(*args):
+            raise failure
+        return fetch
+    metrics.SHARED_RESPONSES.inc(len(group) - 1)
+    return lambda *args: response
+
+
+class PollingEngine:
+    """Опрашивает API для множества подписок из одного процесса.
+
+    Подписки с общим токеном опрашиваются вместе, одним запросом
+    к API. Сетевые вызовы выполняются в пуле потоков, число
+    одновременных циклов опроса ограничено `concurrency`. Если передан
+    `outbox`, уведомления записываются в него, а `bot` должен быть
+    очередью `OutboundQueue`, доставляющей этот журнал.
+    """
+
+    def __init__(self, bot, subscriptions, concurrency=POLL_CONCURRENCY,
+                 start_window=FAST_START_WINDOW, store=None, outbox=None,
+                 profiler=None):
+        self.bot = bot
+        self.subscriptions = list(subscriptions)
+        self.groups = group_by_token(self.subscriptions)
+        self.store = store
+        self.outbox = outbox
+        self.concurrency = concurrency
+        self.start_window = start_window
+        self.start_delays = {}
+        self.profiler = profiler or CycleProfiler()
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='poll'
+        )
+        self.semaphore = None
+        self.stopped = None
+
+    def process(self, group):
+        """Выполняет один цикл опроса подписок токена в рабочем потоке."""
+        with self.profiler.cycle():
+            self.poll_group(group)
+        if self.outbox is not None:
+            self.bot.wake()
+
+    def poll_group(self, group):
+        """Опрашивает API для группы и сохраняет состояние её подписок."""
+        fetch = fetch_group(group)
+        for subscription in group:
+            try:
+                subscription.timestamp = poll_homeworks(
+                    self.bot, subscription.chat_id, subscription.headers,
+                    subscription.timestamp, subscription.last_send,
+                    subscription.scheduler, self.outbox, fetch
+                )
+            except Exception as error:
+                logging.error(f'{subscription}: cycle failed: {error}')
+            if self.store is not None:
+                self.store.save(
+                    subscription.key, subscription.timestamp,
+                    subscription.last_send
+                )
+
+    def restore(self):
+        """Восстанавливает метки и отпечатки подписок из хранилища.
+
+        Подписки, опрошенные незадолго до перезапуска, продолжают
+        по прежнему расписанию, остальные опрашиваются сразу.
+        """
+        states = self.store.load_all()
+        for subscription in self.subscriptions:
+            if subscription.key in states:
+                subscription.timestamp, last_send, updated_at = (
+                    states[subscription.key]
+                )
+                subscription.last_send = DedupCache(last_send)
+                self.start_delays[subscription.key] = resume_delay(
+                    updated_at, RETRY_TIME
+                )
+
+    def stop(self):
+        """Останавливает опрос после завершения текущих циклов."""
+        if self.stopped is None:
+            self.stopped = asyncio.Event()
+        self.stopped.set()
+
+    async def pause(self, delay):
+        """Ждёт delay секунд; возвращает True, если опрос остановлен."""
+        try:
+            await asyncio.wait_for(self.stopped.wait(), delay)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def flush_periodically(self):
+        """Периодически сбрасывает накопленные изменения состояния."""
+        loop = asyncio.get_event_loop()
+        while not await self.pause(self.store.commit_interval):
+            await loop.run_in_executor(self.executor, self.store.flush)
+
+    async def poll_once(self, group):
+        """Запускает цикл опроса группы с учётом лимита параллельности."""
+        async with self.semaphore:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(self.executor, self.process, group)
+
+    async def run_group(self, group):
+        """Опрашивает подписки одного токена до остановки движка.
+
+        Группа ждёт наименьшую из пауз, назначенных её подписками.
+        """
+        delay = min(
+            self.start_delays.get(subscription.key, 0)
+            for subscription in group
+        )
+        if await self.pause(delay + random.uniform(0, self.start_window)):
+            return
+        while True:
+            await self.poll_once(group)
+            delay = min(
+                subscription.scheduler.next_delay() for subscription in group
+            )
+            if await self.pause(delay):
+                return
+
+    async def run(self):
+        """Запускает опрос всех подписок и ждёт остановки."""
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        if self.stopped is None:
+            self.stopped = asyncio.Event()
+        if self.store is not None:
+            self.restore()
+        tasks = [self.run_group(group) for group in self.groups]
+        if self.store is not None:
+            tasks.append(self.flush_periodically())
+        logging.info(
+            f'Polling {len(self.subscriptions)} subscriptions '
+            f'({len(self.groups)} tokens) with concurrency {self.concurrency}'
+        )
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            self.executor.shutdown(wait=False)
+            if self.store is not None:
+                self.store.flush()
+
+
+def make_bot(concurrency=POLL_CONCURRENCY):
+    """Создаёт бота с пулом соединений под заданную параллельность."""
+    return telegram.Bot(
+        token=TELEGRAM_TOKEN, request=Request(con_pool_size=concurrency)
+    )
+
+
+def register_metrics(outbound, outbox):
+    """Публикует глубину внутренних очередей движка в метриках."""
+    metrics.QUEUE_DEPTH.set_function(
+        lambda: outbound.queue.qsize() if outbound.queue else 0,
+        queue='outbound'
+    )
+    metrics.QUEUE_DEPTH.set_function(
+        lambda: sum(map(len, list(outbound.pending.values()))),
+        queue='coalescing'
+    )
+    metrics.QUEUE_DEPTH.set_function(
+        lambda: len(outbox.pending), queue='outbox'
+    )
+
+
+async def serve(engine, outbound, shutdown):
+    """Работает до сигнала остановки, затем корректно завершается.
+
+    После сигнала новые циклы не начинаются, текущие доводятся до
+    конца, очередь отправки доставляется, пока не истечёт отведённое
+    на остановку время.
+    """
+    loop = asyncio.get_event_loop()
+    requested = asyncio.Event()
+    shutdown.on_request(engine.stop)
+    shutdown.on_request(requested.set)
+    shutdown.install(loop, signals=(signal.SIGTERM, signal.SIGINT))
+    delivery = asyncio.ensure_future(outbound.run())
+    polling = asyncio.ensure_future(engine.run())
+    await requested.wait()
+    await asyncio.wait([polling], timeout=shutdown.remaining())
+    try:
+        await asyncio.wait_for(outbound.join(), shutdown.remaining())
+    except asyncio.TimeoutError:
+        logging.warning('Outbound queue not drained before shutdown')
+    for task in (polling, delivery):
+        task.cancel()
+    await asyncio.gather(polling, delivery, return_exceptions=True)
+
+
+def main(subscriptions=None, outbox_path=OUTBOX_PATH,
+         global_rate=TELEGRAM_GLOBAL_RATE, metrics_port=metrics.METRICS_PORT):
+    """Запускает опрос подписок, по умолчанию всех из SUBSCRIPTIONS_FILE.
+
+    Воркеры `supervisor` передают сюда свою часть подписок, свой
+    журнал уведомлений, долю общего лимита Telegram и порт метрик.
+    """
+    if TELEGRAM_TOKEN is None:
+        raise KeyError('No required environment')
+    if subscriptions is None:
+        subscriptions = load_subscriptions(SUBSCRIPTIONS_FILE)
+    http_session.configure(pool_size=POLL_CONCURRENCY)
+    store = StateStore()
+    outbox = Outbox(outbox_path)
+    outbound = OutboundQueue(
+        make_bot(OUTBOUND_WORKERS), global_rate=global_rate, outbox=outbox
+    )
+    engine = PollingEngine(
+        outbound, subscriptions, store=store, outbox=outbox,
+        profiler=CycleProfiler().install()
+    )
+    register_metrics(outbound, outbox)
+    metrics.start_server(metrics_port)
+    try:
+        asyncio.get_event_loop().run_until_complete(
+            serve(engine, outbound, GracefulShutdown())
+        )
+    finally:
+        outbox.close()
+        store.close()
+
+
+if __name__ == '__main__':
+    configure_logging(level=logging.INFO)
+    main()
@@ -0,0 +1,79 @@
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+ERROR_DIGEST_WINDOW = float(os.getenv('ERROR_DIGEST_WINDOW', 60 * 60))
+TEMPLATE_LENGTH = 120
+
+_PATTERNS = (
+    (re.compile(r'\w+://\S+'), '<url>'),
+    (re.compile(r'\{[^{}]*\}'), '<dict>'),
+    (re.compile(r'\'[^\']*\'|"[^"]*"'), '<str>'),
+    (re.compile(r'0x[0-9a-fA-F]+|\d+(\.\d+)?'), '<n>'),
+)
+
+
+def error_template(message):
+    """Заменяет в тексте ошибки изменчивые части заглушками."""
+    for pattern, placeholder in _PATTERNS:
+        message = pattern.sub(placeholder, message)
+    return message[:TEMPLATE_LENGTH]
+
+
+def fingerprint(error):
+    """Возвращает отпечаток ошибки: класс исключения и шаблон текста.
+
+    Ошибки, отличающиеся только адресами, параметрами, числами
+    и строками в тексте, получают одинаковый отпечаток.
+    """
+    return type(error).__name__, error_template(str(error))
+
+
+class ErrorDigest:
+    """Считает повторы ошибок по отпечаткам в окне `window` секунд.
+
+    Первая ошибка с новым отпечатком в окне сообщается сразу,
+    повторы только подсчитываются и попадают в сводку, которую
+    `flush` возвращает по истечении окна вместе с его началом.
+    """
+
+    def __init__(self, window=ERROR_DIGEST_WINDOW, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self.chats = {}
+        self.lock = threading.Lock()
+
+    def add(self, chat_id, error_fingerprint):
+        """Учитывает ошибку; возвращает True, если о ней нужно сообщить."""
+        with self.lock:
+            started, counts = self.chats.setdefault(
+                chat_id, (self.clock(), Counter())
+            )
+            counts[error_fingerprint] += 1
+            return counts[error_fingerprint] == 1
+
+    def flush(self, chat_id):
+        """Возвращает начало истёкшего окна и сводку повторов за него.
+
+        Пока окно не истекло или повторов не было, возвращает None.
+        """
+        with self.lock:
+            if chat_id not in self.chats:
+                return None
+            started, counts = self.chats[chat_id]
+            if self.clock() - started < self.window:
+                return None
+            del self.chats[chat_id]
+        repeated = [
+            f'{name} ×{count}: {template}'
+            for (name, template), count in counts.most_common()
+            if count > 1
+        ]
+        if not repeated:
+            return None
+        minutes = round(self.window / 60)
+        return started, '\n'.join(
+            [f'Сбои за последние {minutes} мин.:'] + repeated
+        )
@@ -1,7 +1,18 @@
+class CircuitOpenError(Exception):
+    """Если цепь к внешнему сервису разомкнута после серии сбоев."""
+
+    def __init__(self, *args, retry_after=None):
+        super().__init__(*args)
+        self.retry_after = retry_after
+
+
 class HTTPRequestError(Exception):
     """Если нет ответа от сервера возвращает."""
 
-    pass
+    def __init__(self, *args, retry_after=None, status_code=None):
+        super().__init__(*args)
+        self.retry_after = retry_after
+        self.status_code = status_code
 
 
 class MessageNotSend(Exception):
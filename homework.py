@@ -2,27 +2,51 @@ import logging
 import os
 import sys
 import time
+from functools import partial
 from http import HTTPStatus
 
-import requests
-import telegram
 from dotenv import load_dotenv
 
+import http_session
+import metrics
+import recording
+from breaker import CircuitBreaker
+from dedup import DedupCache, digest
+from error_digest import ErrorDigest, fingerprint
 from exceptions import HTTPRequestError, MessageNotSend, ServerError
+from lazy import Deferred, lazy_import
+from lifecycle import GracefulShutdown, resume_delay
+from log_config import configure_logging
+from outbox import Outbox
+from profiling import CycleProfiler
+from ratelimit import (NORMAL, URGENT, RateLimiter, SharedTokenBucket,
+                       TokenBucket)
+from records import Homework
+from scheduler import make_scheduler, parse_retry_after
+from singleflight import SingleFlight
+from snapshot import transitions
+from state import StateStore, subscription_key
+from streaming import CHUNK_SIZE, HomeworkStream
+from validator import compile_schema, raise_for_errors
+from watermark import advance
+
+telegram = lazy_import('telegram')
 
 load_dotenv()
 
-file_handler = logging.FileHandler(filename='main.log')
-stdout_handler = logging.StreamHandler(stream=sys.stdout)
-
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 TOKEN_NAMES = ['PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID']
 
-RETRY_TIME = 600
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', '').lower() in (
+    '1', 'true', 'yes'
+)
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+API_RATE = float(os.getenv('API_RATE', 5))
+API_BURST = float(os.getenv('API_BURST', 10))
+API_RATE_DB = os.getenv('API_RATE_DB')
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -30,80 +54,256 @@ HOMEWORK_VERDICTS = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+HOMEWORK_SCHEMA = {
+    'type': dict,
+    'keys': {
+        'homework_name': {'type': object},
+        'status': {'type': object, 'choices': HOMEWORK_VERDICTS},
+    },
+}
+RESPONSE_SCHEMA = {
+    'type': dict,
+    'non_empty': True,
+    'keys': {
+        'homeworks': {'type': list},
+    },
+}
 
-def send_message(bot, message):
-    """Отправляет сообщение в Telegram чат."""
+
+def make_api_limiter(rate=API_RATE, burst=API_BURST, path=API_RATE_DB):
+    """Создаёт ограничитель запросов к API, общий для процессов по path."""
+    if path:
+        bucket = SharedTokenBucket(path, 'practicum', rate, burst)
+    else:
+        bucket = TokenBucket(rate, burst)
+    return RateLimiter(bucket)
+
+
+api_limiter = Deferred(make_api_limiter)
+flights = SingleFlight()
+error_digest = ErrorDigest()
+
+
+def practicum_failure(error):
+    """Проверяет, что ошибка говорит о недоступности API Практикума."""
+    if isinstance(error, ServerError):
+        return True
+    return isinstance(error, HTTPRequestError) and (
+        error.status_code is None
+        or error.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        or error.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    )
+
+
+def telegram_failure(error):
+    """Проверяет, что ошибка говорит о недоступности Telegram."""
+    return (
+        isinstance(error, telegram.error.NetworkError)
+        and not isinstance(error, telegram.error.BadRequest)
+    )
+
+
+practicum_breaker = CircuitBreaker('practicum', is_failure=practicum_failure)
+telegram_breaker = CircuitBreaker('telegram', is_failure=telegram_failure)
+metrics.BREAKER_STATE.set_function(
+    practicum_breaker.state_code, upstream='practicum'
+)
+metrics.QUEUE_DEPTH.set_function(
+    lambda: len(api_limiter.get()), queue='api_limiter'
+)
+metrics.BREAKER_STATE.set_function(
+    telegram_breaker.state_code, upstream='telegram'
+)
+
+validate_homework = compile_schema(HOMEWORK_SCHEMA, 'homework')
+validate_homework_list = compile_schema(
+    {'type': list, 'items': HOMEWORK_SCHEMA}, 'homeworks'
+)
+validate_response_root = compile_schema(RESPONSE_SCHEMA)
+validate_response_full = compile_schema(
+    dict(RESPONSE_SCHEMA, keys=dict(
+        RESPONSE_SCHEMA['keys'],
+        homeworks={'type': list, 'items': HOMEWORK_SCHEMA}
+    ))
+)
+
+
+def make_headers(token):
+    """Формирует заголовки авторизации для токена Практикума."""
+    return {'Authorization': f'OAuth {token}'}
+
+
+def make_bot():
+    """Создаёт бота Telegram."""
+    return telegram.Bot(token=TELEGRAM_TOKEN)
+
+
+def deliver_message(bot, chat_id, message):
+    """Отправляет сообщение в указанный Telegram чат."""
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        with metrics.SEND_LATENCY.time():
+            telegram_breaker.call(bot.send_message, chat_id, message)
+        recording.record('send', chat=chat_id, text=message)
         logging.info('Message send')
     except Exception as error:
         raise MessageNotSend(
             f'{error}!!! Message: {message}'
-            f'to chat: {TELEGRAM_CHAT_ID} not delivered'
-        )
+            f'to chat: {chat_id} not delivered'
+        ) from error
 
 
-def get_api_answer(current_timestamp):
-    """Делает запрос к эндпоинту API-сервиса."""
+def send_message(bot, message):
+    """Отправляет сообщение в Telegram чат."""
+    deliver_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def fetch_api_answer(current_timestamp, headers, deadline=None):
+    """Делает запрос к эндпоинту API-сервиса с заданными заголовками.
+
+    `deadline` (по time.monotonic) ограничивает запрос вместе
+    с повторами, по умолчанию — HTTP_DEADLINE секунд.
+    """
     params = {'from_date': current_timestamp}
     try:
         logging.info(
             f'Sending a request to {ENDPOINT} with parameters {params}'
         )
-        response = requests.get(ENDPOINT, headers=HEADERS, params=params)
+        with metrics.API_LATENCY.time():
+            response = http_session.get(
+                ENDPOINT, deadline=deadline, headers=headers, params=params,
+                stream=STREAM_RESPONSES
+            )
     except Exception as error:
         raise ServerError(
             f'{error}!!! Adress: {ENDPOINT}'
-            f' with headers: {HEADERS} and'
+            f' with headers: {headers} and'
             f' parameters: {params} does not answer'
         )
     if response.status_code != HTTPStatus.OK:
+        if STREAM_RESPONSES:
+            response.close()
         raise HTTPRequestError(
             f'Эндпоинт {response.url} недоступен. '
-            f'Код ответа API: {response.status_code}]'
+            f'Код ответа API: {response.status_code}]',
+            retry_after=parse_retry_after(response),
+            status_code=response.status_code
+        )
+    if STREAM_RESPONSES:
+        return HomeworkStream(
+            response.iter_content(CHUNK_SIZE), close=response.close
         )
-    return response.json()
+    answer = response.json()
+    recording.record(
+        'api', user=digest(headers.get('Authorization')),
+        from_date=current_timestamp, response=answer
+    )
+    return answer
 
 
-def check_response(response):
-    """Проверяет ответ API на корректность."""
-    if not response:
-        raise KeyError('Empty dictionary')
+def _fetch_in_turn(current_timestamp, headers, priority, deadline):
+    api_limiter.acquire(priority)
+    return fetch_api_answer(current_timestamp, headers, deadline)
 
-    if not isinstance(response, dict):
-        raise TypeError(
-            'Wrong type response.'
-            f'Should have come dict but came {type(response)}'
-        )
 
-    if 'homeworks' not in response:
-        raise KeyError('Key homeworks missing')
+def fetch_limited(current_timestamp, headers, priority=NORMAL, deadline=None):
+    """Запрашивает API через цепь `practicum_breaker` и общий лимит.
 
-    homeworks_response = response['homeworks']
-    if not isinstance(homeworks_response, list):
-        raise TypeError(
-            'Wrong type homeworks.'
-            f'Should have come list but came {type(homeworks_response)}'
-        )
+    Пока цепь разомкнута, запрос отклоняется сразу, не занимая очередь
+    лимита. Запросы с приоритетом URGENT получают очередь первыми.
+    """
+    return practicum_breaker.call(
+        _fetch_in_turn, current_timestamp, headers, priority, deadline
+    )
 
-    return homeworks_response
 
+def fetch_shared(current_timestamp, headers, priority=NORMAL, deadline=None):
+    """Запрашивает API, объединяя одинаковые запросы разных чатов.
 
-def parse_status(homework):
-    """Извлекает название и статус из конкретной домашней работы."""
-    if 'homework_name' not in homework:
-        raise KeyError('Missing key \'homework_name\'.')
-    name = homework['homework_name']
+    Одновременные запросы с одним токеном и одной меткой времени
+    получают ответ одного HTTP-запроса. Движок опрашивает чаты одного
+    токена общим запросом сам (`engine.fetch_group`). Потоковые ответы
+    читаются один раз, поэтому не объединяются.
+    """
+    if STREAM_RESPONSES:
+        return fetch_limited(current_timestamp, headers, priority, deadline)
+    response, shared = flights.do(
+        (headers.get('Authorization'), current_timestamp),
+        fetch_limited, current_timestamp, headers, priority, deadline
+    )
+    if shared:
+        metrics.SHARED_RESPONSES.inc()
+    return response
 
-    if 'status' not in homework:
-        raise KeyError('Missing key status.')
-    status = homework['status']
 
-    if status not in HOMEWORK_VERDICTS:
-        raise KeyError(f'{status} not among the possible')
-    verdict = HOMEWORK_VERDICTS.get(status)
+def get_api_answer(current_timestamp):
+    """Делает запрос к эндпоинту API-сервиса."""
+    return fetch_limited(current_timestamp, HEADERS)
 
-    return f'Изменился статус проверки работы "{name}". {verdict}'
+
+def check_response(response):
+    """Проверяет ответ API на корректность."""
+    if isinstance(response, HomeworkStream):
+        return response
+
+    errors = []
+    validate_response_root(response, errors)
+    raise_for_errors(errors)
+    return response['homeworks']
+
+
+def validate_response(response):
+    """Проверяет ответ вместе со всеми работами за один проход.
+
+    Не останавливается на первой ошибке и возвращает список
+    `ValidationError`; пустой список означает корректный ответ.
+    """
+    errors = []
+    validate_response_full(response, errors)
+    return errors
+
+
+def check_homeworks(homeworks):
+    """Проверяет все работы списка за один проход.
+
+    Все найденные ошибки логируются, поднимается первая из них.
+    """
+    errors = []
+    if not validate_homework_list(homeworks, errors):
+        for error in errors:
+            logging.error(f'Invalid homeworks{error.path}: {error.message}')
+        raise_for_errors(errors)
+
+
+def parse_homeworks(homeworks):
+    """Проверяет работы из ответа API и отдаёт их записями `Homework`.
+
+    Разбор выполняется один раз при получении ответа, дальше бот
+    работает только с записями. Список работ проверяется целиком
+    `check_homeworks`, а работы из потокового ответа — по одной,
+    чтобы ответ не собирался в памяти.
+    """
+    if isinstance(homeworks, list):
+        check_homeworks(homeworks)
+        for homework in homeworks:
+            yield Homework.from_dict(homework)
+        return
+    for homework in homeworks:
+        errors = []
+        validate_homework(homework, errors)
+        raise_for_errors(errors)
+        yield Homework.from_dict(homework)
+
+
+def parse_status(homework):
+    """Извлекает название и статус из конкретной домашней работы.
+
+    Принимает запись `Homework` или словарь из ответа API.
+    """
+    if not isinstance(homework, Homework):
+        homework, = parse_homeworks([homework])
+    verdict = HOMEWORK_VERDICTS[homework.status]
+
+    return f'Изменился статус проверки работы "{homework.name}". {verdict}'
 
 
 def check_tokens():
@@ -116,49 +316,151 @@ def check_tokens():
     return variable_availability
 
 
+def notify(bot, chat_id, message, outbox=None, key=None):
+    """Отправляет уведомление сразу или записывает его в журнал отправки."""
+    if outbox is None:
+        deliver_message(bot, chat_id, message)
+    else:
+        outbox.add(key, chat_id, message)
+
+
+def report_error(bot, chat_id, error, last_send, outbox=None, key=None):
+    """Логирует сбой и сообщает о нём в чат, если он не повторяется.
+
+    Ошибки сравниваются по отпечатку: о первой ошибке с отпечатком
+    в окне ERROR_DIGEST_WINDOW сообщается сразу, повторы попадают
+    в сводку `send_error_digest`.
+    """
+    metrics.ERRORS.inc(type=type(error).__name__)
+    message = f'Сбой в работе программы: {error}'
+    logging.error(message)
+    if outbox is None and isinstance(error, MessageNotSend):
+        return
+    error_fingerprint = fingerprint(error)
+    first = error_digest.add(chat_id, error_fingerprint)
+    if first and not last_send.seen('error', error_fingerprint):
+        notify(
+            bot, chat_id, message, outbox,
+            f'{key}:{digest(error_fingerprint)}'
+        )
+        last_send.remember('error', error_fingerprint)
+
+
+def send_error_digest(bot, chat_id, outbox=None):
+    """Сообщает сводку повторявшихся сбоев, когда истекает окно."""
+    flushed = error_digest.flush(chat_id)
+    if flushed is None:
+        return
+    started, summary = flushed
+    try:
+        notify(
+            bot, chat_id, summary, outbox,
+            f'{chat_id}:digest:{started}:{digest(summary)}'
+        )
+    except MessageNotSend as error:
+        logging.error(error)
+
+
+@metrics.CYCLE_DURATION.timed
+def poll_homeworks(bot, chat_id, headers, current_timestamp, last_send,
+                   scheduler, outbox=None, fetch=None, deadline=None):
+    """Выполняет один цикл опроса API и уведомления чата.
+
+    `last_send` — `DedupCache` с отпечатками состояний работ по их id
+    и последней отправленной ошибки. Если передан `outbox`, уведомления
+    только записываются в журнал, а доставляет их `Outbox.drain`.
+    `fetch` заменяет `fetch_shared`, например чтобы отдать чату ответ,
+    уже полученный для другого чата с тем же токеном. `deadline`
+    (по time.monotonic) ограничивает запрос к API.
+    Возвращает метку времени для следующего запроса.
+    """
+    fetch = fetch or partial(fetch_shared, deadline=deadline)
+    try:
+        response = fetch(
+            current_timestamp, headers,
+            URGENT if scheduler.urgent() else NORMAL
+        )
+        homeworks = check_response(response)
+        changed = []
+        for key, state, homework in transitions(
+            last_send, parse_homeworks(homeworks)
+        ):
+            notify(
+                bot, chat_id, parse_status(homework), outbox,
+                f'{chat_id}:{key}:{state[0]}:{state[1]}'
+            )
+            last_send.remember(key, state)
+            changed.append(homework)
+        scheduler.observe(changed)
+        if len(homeworks) == 0:
+            logging.debug('Ответ API пуст: нет домашних работ.')
+        current_timestamp = advance(
+            current_timestamp, response.get('current_date')
+        )
+    except Exception as error:
+        scheduler.observe(error=error)
+        report_error(
+            bot, chat_id, error, last_send, outbox,
+            f'{chat_id}:error:{current_timestamp}'
+        )
+    else:
+        last_send.forget('error')
+    send_error_digest(bot, chat_id, outbox)
+    return current_timestamp
+
+
 def main():
     """Основная логика работы бота."""
     if not check_tokens():
         raise KeyError('No required environment')
 
-    last_send = {
-        'error': None,
-    }
-
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
-
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            homeworks = check_response(response)
-            if len(homeworks) == 0:
-                logging.debug('Ответ API пуст: нет домашних работ.')
-                continue
-            for homework in homeworks:
-                message = parse_status(homework)
-                if last_send.get(homework['homework_name']) != message:
-                    send_message(bot, message)
-                    last_send[homework['homework_name']] = message
-            current_timestamp = response.get('current_date')
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            logging.error(message)
-            if last_send['error'] != message:
-                send_message(bot, message)
-                last_send['error'] = message
-        else:
-            last_send['error'] = None
-        finally:
-            time.sleep(RETRY_TIME)
+    store = StateStore()
+    key = subscription_key(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)
+    current_timestamp, last_send, updated_at = store.load(key) or (
+        int(time.time()), {}, 0
+    )
+    last_send = DedupCache(last_send)
+
+    http_session.configure()
+    bot = Deferred(make_bot)
+    scheduler = make_scheduler()
+    outbox = Outbox()
+    metrics.QUEUE_DEPTH.set_function(
+        lambda: len(outbox.pending), queue='outbox'
+    )
+    metrics.start_server()
+    shutdown = GracefulShutdown().install()
+    profiler = CycleProfiler().install()
+    send = partial(deliver_message, bot)
+
+    try:
+        shutdown.wait(resume_delay(updated_at, scheduler.next_delay()))
+        while not shutdown.is_set():
+            # Цикл, прерванный сигналом, завершается за SHUTDOWN_TIMEOUT.
+            deadline = min(
+                shutdown.deadline(),
+                time.monotonic() + http_session.HTTP_DEADLINE
+            )
+            try:
+                with profiler.cycle():
+                    current_timestamp = poll_homeworks(
+                        bot, TELEGRAM_CHAT_ID, HEADERS, current_timestamp,
+                        last_send, scheduler, outbox, deadline=deadline
+                    )
+                    store.save(key, current_timestamp, last_send)
+                    outbox.drain(send, deadline=shutdown.deadline())
+            finally:
+                shutdown.wait(scheduler.next_delay())
+    finally:
+        outbox.drain(send, deadline=shutdown.deadline())
+        outbox.close()
+        store.close()
 
 
 if __name__ == '__main__':
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s | %(name)s | %(levelname)s '
-               '| %(funcName)s | %(lineno)s | %(message)s',
-        handlers=[file_handler, stdout_handler]
-
-    )
-    main()
+    if '--profile-startup' in sys.argv[1:]:
+        from startup import profile_startup
+        profile_startup()
+    else:
+        configure_logging(level=logging.DEBUG, compress=True)
+        main()
@@ -0,0 +1,219 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+import metrics
+from lazy import lazy_import
+
+requests = lazy_import('requests')
+
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 15))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 3))
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5))
+HTTP_DEADLINE = float(os.getenv('HTTP_DEADLINE', 30))
+HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', 0))
+HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', 20))
+LATENCY_WINDOW = 200
+MIN_ATTEMPT_TIMEOUT = 0.05
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_session = None
+_timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+_retries = 0
+_backoff_factor = 0.0
+
+
+class LatencyWindow:
+    """Длительности последних успешных запросов."""
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def add(self, value):
+        """Запоминает длительность запроса."""
+        with self.lock:
+            self.samples.append(value)
+
+    def percentile(self, percent, min_samples=HEDGE_MIN_SAMPLES):
+        """Возвращает перцентиль длительности или None, если мало данных."""
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples or len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percent / 100))
+        return samples[index]
+
+
+latencies = LatencyWindow()
+
+
+def create_session(pool_size=HTTP_POOL_SIZE, retries=HTTP_RETRIES,
+                   backoff_factor=HTTP_BACKOFF_FACTOR):
+    """Создаёт сессию с пулом keep-alive соединений и повторами GET."""
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def configure(pool_size=HTTP_POOL_SIZE, connect_timeout=HTTP_CONNECT_TIMEOUT,
+              read_timeout=HTTP_READ_TIMEOUT, retries=HTTP_RETRIES,
+              backoff_factor=HTTP_BACKOFF_FACTOR):
+    """Включает общую сессию для всех последующих запросов."""
+    global _session, _timeout, _retries, _backoff_factor
+    close()
+    _session = create_session(pool_size, retries, backoff_factor)
+    _timeout = (connect_timeout, read_timeout)
+    _retries = retries
+    _backoff_factor = backoff_factor
+    return _session
+
+
+def close():
+    """Закрывает общую сессию и возвращает настройки по умолчанию."""
+    global _session, _timeout, _retries, _backoff_factor
+    if _session is not None:
+        _session.close()
+        _session = None
+    _timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    _retries = 0
+    _backoff_factor = 0.0
+
+
+def backoff_total(retries, backoff_factor):
+    """Суммарная пауза urllib3 между `retries` повторами (с запасом)."""
+    return backoff_factor * (2 ** retries - 1)
+
+
+def split_budget(remaining, retries=None, backoff_factor=None):
+    """Делит оставшееся время между попытками запроса.
+
+    Из бюджета вычитаются паузы между повторами, остаток делится
+    поровну между попытками, а доля попытки — между соединением
+    и чтением в пропорции настроенных тайм-аутов. Возвращает
+    тайм-ауты (connect, read) одной попытки, не больше настроенных.
+    """
+    retries = _retries if retries is None else retries
+    backoff_factor = (
+        _backoff_factor if backoff_factor is None else backoff_factor
+    )
+    budget = remaining - backoff_total(retries, backoff_factor)
+    share = max(MIN_ATTEMPT_TIMEOUT, budget / (retries + 1))
+    connect_timeout, read_timeout = _timeout
+    connect = min(
+        connect_timeout, share * connect_timeout / sum(_timeout)
+    )
+    return connect, min(read_timeout, share - connect)
+
+
+def _submit(url, kwargs):
+    # Попытка идёт в daemon-потоке: брошенный по дедлайну запрос
+    # не задерживает завершение процесса.
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(_send(url, kwargs))
+        except BaseException as error:
+            future.set_exception(error)
+
+    threading.Thread(target=run, name='http', daemon=True).start()
+    return future
+
+
+def _send(url, kwargs):
+    start = time.monotonic()
+    if _session is None:
+        response = requests.get(url, **kwargs)
+    else:
+        response = _session.get(url, **kwargs)
+    latencies.add(time.monotonic() - start)
+    return response
+
+
+def _discard(future):
+    # Ответ проигравшего запроса больше не нужен.
+    if not future.cancelled() and future.exception() is None:
+        close_response = getattr(future.result(), 'close', None)
+        if close_response is not None:
+            close_response()
+
+
+def _hedge(futures, url, kwargs, hedge_percentile, remaining):
+    # Дублирует запрос, если он не ответил за перцентиль длительности.
+    hedge_after = (
+        latencies.percentile(hedge_percentile) if hedge_percentile else None
+    )
+    if hedge_after is None or hedge_after >= remaining:
+        return
+    done, _ = wait(futures, timeout=hedge_after)
+    if not done:
+        metrics.HEDGED_REQUESTS.inc()
+        futures.add(_submit(url, kwargs))
+
+
+def _first_result(futures, deadline, url):
+    # Возвращает первый успешный ответ; остальные закрываются по готовности.
+    error = None
+    while futures:
+        done, futures = wait(
+            futures, timeout=max(0.0, deadline - time.monotonic()),
+            return_when=FIRST_COMPLETED
+        )
+        if not done:
+            break
+        for future in done:
+            if future.exception() is None:
+                for other in futures:
+                    other.add_done_callback(_discard)
+                return future.result()
+            error = error or future.exception()
+    for future in futures:
+        future.add_done_callback(_discard)
+    if error is not None and not futures:
+        raise error
+    raise requests.Timeout(f'GET {url} exceeded deadline')
+
+
+def get(url, deadline=None, hedge_percentile=HEDGE_PERCENTILE, **kwargs):
+    """Выполняет GET-запрос через общую сессию.
+
+    Пока сессия не настроена через `configure`, запрос уходит
+    через `requests.get` с теми же тайм-аутами.
+
+    Запрос вместе с повторами ограничен `deadline` по time.monotonic
+    (по умолчанию HTTP_DEADLINE секунд от вызова); по его истечении
+    поднимается `requests.Timeout`. Если задан `hedge_percentile`
+    и первый запрос не ответил за этот перцентиль длительности
+    последних запросов, отправляется второй, и возвращается ответ,
+    пришедший первым.
+    """
+    if deadline is None:
+        deadline = time.monotonic() + HTTP_DEADLINE
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise requests.Timeout(f'Deadline exceeded before GET {url}')
+    kwargs.setdefault('timeout', split_budget(remaining))
+    futures = {_submit(url, kwargs)}
+    _hedge(futures, url, kwargs, hedge_percentile, remaining)
+    return _first_result(futures, deadline, url)
@@ -0,0 +1,40 @@
+import importlib.util
+import sys
+import threading
+
+
+def lazy_import(name):
+    """Возвращает модуль, который загрузится при первом обращении к нему.
+
+    Тяжёлые зависимости не замедляют импорт бота и сбор тестов,
+    пока их атрибуты не понадобятся.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+class Deferred:
+    """Создаёт клиент функцией factory при первом обращении к атрибутам."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Возвращает клиент, создавая его при необходимости."""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
@@ -0,0 +1,77 @@
+import logging
+import os
+import signal
+import threading
+import time
+
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 20))
+FAST_START_WINDOW = float(os.getenv('FAST_START_WINDOW', 10))
+SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+def resume_delay(updated_at, interval, now=None):
+    """Возвращает паузу до опроса, который был запланирован до перезапуска.
+
+    Если с последнего опроса прошло больше `interval` секунд, опрос
+    нужен сразу.
+    """
+    now = time.time() if now is None else now
+    return max(0.0, updated_at + interval - now)
+
+
+class GracefulShutdown:
+    """Запрос остановки процесса по сигналам SIGTERM и SIGINT.
+
+    После запроса у процесса есть `timeout` секунд, чтобы доставить
+    отправляемое и сохранить состояние; `remaining` возвращает, сколько
+    из них осталось. Ожидание через `wait` прерывается сразу.
+    """
+
+    def __init__(self, timeout=SHUTDOWN_TIMEOUT):
+        self.timeout = timeout
+        self.event = threading.Event()
+        self.requested_at = None
+        self.callbacks = []
+
+    def install(self, loop=None, signals=SIGNALS):
+        """Подписывается на сигналы остановки."""
+        for signum in signals:
+            if loop is None:
+                signal.signal(signum, self.request)
+            else:
+                loop.add_signal_handler(signum, self.request, signum)
+        return self
+
+    def on_request(self, callback):
+        """Добавляет функцию, вызываемую при запросе остановки."""
+        self.callbacks.append(callback)
+
+    def request(self, signum=None, frame=None):
+        """Запрашивает остановку."""
+        if self.event.is_set():
+            return
+        logging.info(f'Shutdown requested by signal {signum}')
+        self.requested_at = time.monotonic()
+        self.event.set()
+        for callback in self.callbacks:
+            callback()
+
+    def is_set(self):
+        """Проверяет, запрошена ли остановка."""
+        return self.event.is_set()
+
+    def wait(self, timeout):
+        """Ждёт timeout секунд; возвращает True, если запрошена остановка."""
+        return self.event.wait(timeout)
+
+    def remaining(self):
+        """Возвращает время, оставшееся на корректную остановку."""
+        if self.requested_at is None:
+            return self.timeout
+        return max(
+            0.0, self.requested_at + self.timeout - time.monotonic()
+        )
+
+    def deadline(self):
+        """Возвращает момент time.monotonic(), к которому нужно завершиться."""
+        return time.monotonic() + self.remaining()
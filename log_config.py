@@ -0,0 +1,137 @@
+import atexit
+import gzip
+import logging
+import os
+import queue
+import shutil
+import sys
+from logging.handlers import (QueueHandler, QueueListener,
+                              RotatingFileHandler, TimedRotatingFileHandler)
+
+LOG_FILE = os.getenv('LOG_FILE', 'main.log')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+LOG_DEBUG_SAMPLE = int(os.getenv('LOG_DEBUG_SAMPLE', 100))
+SAMPLED_TEMPLATES = 1024
+LOG_FORMAT = (
+    '%(asctime)s | %(name)s | %(levelname)s '
+    '| %(funcName)s | %(lineno)s | %(message)s'
+)
+
+
+def gzip_namer(name):
+    """Добавляет расширение .gz к имени ротированного файла."""
+    return f'{name}.gz'
+
+
+def gzip_rotator(source, destination):
+    """Сжимает ротированный файл журнала."""
+    with open(source, 'rb') as original:
+        with gzip.open(destination, 'wb') as compressed:
+            shutil.copyfileobj(original, compressed)
+    os.remove(source)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает только каждое `every`-е повторение DEBUG-сообщения.
+
+    Повторы определяются по шаблону сообщения, первое вхождение
+    всегда проходит. Сообщения уровня INFO и выше не затрагиваются.
+    """
+
+    def __init__(self, every=LOG_DEBUG_SAMPLE):
+        super().__init__()
+        self.every = every
+        self.counts = {}
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.every <= 1:
+            return True
+        if record.msg not in self.counts:
+            if len(self.counts) >= SAMPLED_TEMPLATES:
+                self.counts.clear()
+        count = self.counts.get(record.msg, 0)
+        self.counts[record.msg] = count + 1
+        if count % self.every:
+            return False
+        if count:
+            record.msg = f'{record.msg} (повторено {count} раз)'
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Кладёт записи в ограниченную очередь, не блокируя вызывающий поток.
+
+    При переполнении очереди запись отбрасывается и учитывается
+    в `dropped`.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BackgroundListener(QueueListener):
+    """QueueListener, который можно останавливать повторно."""
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+def make_file_handler(filename, max_bytes, backup_count, when, compress):
+    """Создаёт обработчик файла с ротацией по размеру или по времени."""
+    if when:
+        handler = TimedRotatingFileHandler(
+            filename, when=when, backupCount=backup_count, encoding='utf-8',
+            delay=True
+        )
+    else:
+        handler = RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count,
+            encoding='utf-8', delay=True
+        )
+    if compress:
+        handler.namer = gzip_namer
+        handler.rotator = gzip_rotator
+    return handler
+
+
+def configure_logging(filename=LOG_FILE, level=logging.DEBUG,
+                      max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT,
+                      when=LOG_ROTATE_WHEN, compress=True,
+                      queue_size=LOG_QUEUE_SIZE,
+                      debug_sample=LOG_DEBUG_SAMPLE, stream=sys.stdout):
+    """Настраивает журналирование через очередь и фоновый поток записи.
+
+    Вызывающие потоки только кладут записи в очередь; запись в файл
+    с ротацией и сжатием и вывод в `stream` выполняет QueueListener.
+    Возвращает запущенный listener; он останавливается при выходе.
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [make_file_handler(
+        filename, max_bytes, backup_count, when, compress
+    )]
+    if stream is not None:
+        handlers.append(logging.StreamHandler(stream))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    queue_handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+    queue_handler.addFilter(SamplingFilter(debug_sample))
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers[:] = [queue_handler]
+    listener = BackgroundListener(
+        queue_handler.queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,249 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+METRICS_PORT = os.getenv('METRICS_PORT')
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{value}"' for name, value in zip(names, values)
+    )
+    return f'{{{pairs}}}'
+
+
+class Metric:
+    """Базовая метрика с именем, описанием и метками."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        """Увеличивает счётчик."""
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = list(self.values.items())
+        return [
+            f'{self.name}{_labels(self.labelnames, key)} {value}'
+            for key, value in values
+        ]
+
+
+class Gauge(Metric):
+    """Значение, вычисляемое функцией в момент чтения метрик."""
+
+    kind = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.functions = {}
+
+    def set_function(self, function, **labels):
+        """Задаёт функцию, возвращающую текущее значение."""
+        self.functions[self.key(labels)] = function
+
+    def samples(self):
+        samples = []
+        for key, function in list(self.functions.items()):
+            try:
+                value = function()
+            except Exception as error:
+                logging.debug(f'Gauge {self.name} failed: {error}')
+                continue
+            samples.append(
+                f'{self.name}{_labels(self.labelnames, key)} {value}'
+            )
+        return samples
+
+
+class Histogram(Metric):
+    """Гистограмма с фиксированными границами корзин."""
+
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets=LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        self.series = {}
+
+    def observe(self, value, **labels):
+        """Учитывает одно наблюдение."""
+        key = self.key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Измеряет длительность блока кода."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, function):
+        """Декоратор, измеряющий длительность вызовов функции."""
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.observe(time.perf_counter() - start)
+        return wrapper
+
+    def samples(self):
+        with self.lock:
+            series = [
+                (key, list(values)) for key, values in self.series.items()
+            ]
+        samples = []
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                labels = _labels(
+                    self.labelnames + ('le',), key + (str(bound),)
+                )
+                samples.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _labels(self.labelnames, key)
+            samples.append(f'{self.name}_count{labels} {values[-2]}')
+            samples.append(f'{self.name}_sum{labels} {values[-1]}')
+        return samples
+
+
+class Registry:
+    """Набор метрик, отдаваемых одним эндпоинтом."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def render(self):
+        """Возвращает метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+API_LATENCY = Histogram(
+    'homework_api_request_seconds', 'Latency of Practicum API requests.'
+)
+SEND_LATENCY = Histogram(
+    'telegram_send_seconds', 'Latency of Telegram sendMessage calls.'
+)
+CYCLE_DURATION = Histogram(
+    'poll_cycle_seconds', 'Duration of one polling cycle.'
+)
+HEDGED_REQUESTS = Counter(
+    'homework_api_hedged_total',
+    'Duplicate API requests sent after the hedging delay.'
+)
+SHARED_RESPONSES = Counter(
+    'homework_api_shared_total',
+    'Concurrent API requests coalesced into one in-flight request.'
+)
+ERRORS = Counter(
+    'bot_errors_total', 'Errors raised in polling cycles by type.',
+    labelnames=('type',)
+)
+BREAKER_STATE = Gauge(
+    'circuit_breaker_state',
+    'Circuit breaker state: 0 closed, 1 open, 2 half-open.',
+    labelnames=('upstream',)
+)
+QUEUE_DEPTH = Gauge(
+    'bot_queue_depth', 'Number of items waiting in internal queues.',
+    labelnames=('queue',)
+)
+
+
+def make_handler(registry=REGISTRY):
+    """Создаёт обработчик, отдающий метрики по GET /metrics.
+
+    http.server импортируется только здесь, чтобы не замедлять
+    импорт бота, когда эндпоинт метрик не нужен.
+    """
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def start_server(port=METRICS_PORT, host='0.0.0.0'):
+    """Запускает эндпоинт метрик в фоновом потоке, если задан порт."""
+    if port is None:
+        return None
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, int(port)), make_handler())
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(f'Metrics are served on port {server.server_address[1]}')
+    return server
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from telegram.error import RetryAfter
+
+from exceptions import MessageNotSend
+from homework import deliver_message
+from ratelimit import TokenBucket
+
+TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 30))
+TELEGRAM_CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', 1))
+COALESCE_WINDOW = float(os.getenv('COALESCE_WINDOW', 2))
+OUTBOUND_WORKERS = int(os.getenv('OUTBOUND_WORKERS', 8))
+REDRAIN_INTERVAL = float(os.getenv('OUTBOX_REDRAIN_INTERVAL', 30))
+MAX_RETRIES = 5
+MESSAGE_LIMIT = 4096
+SEPARATOR = '\n\n'
+
+
+def merge_messages(items, limit=MESSAGE_LIMIT):
+    """Склеивает сообщения в как можно меньшее число не длиннее limit.
+
+    Принимает пары (текст, ключ журнала) и возвращает пары
+    (склеенный текст, ключи вошедших в него сообщений).
+    """
+    merged = []
+    current, keys = '', []
+    for text, key in items:
+        candidate = f'{current}{SEPARATOR}{text}' if current else text
+        if current and len(candidate) > limit:
+            merged.append((current, keys))
+            candidate, keys = text, []
+        current = candidate
+        if key is not None:
+            keys.append(key)
+    if current:
+        merged.append((current, keys))
+    return merged
+
+
+class OutboundQueue:
+    """Асинхронная очередь исходящих сообщений Telegram.
+
+    Предоставляет метод `send_message` как у бота, поэтому её можно
+    передать в цикл опроса вместо него: сообщения копятся в окне
+    `coalesce_window` и склеиваются по чатам, а доставка идёт
+    в фоне с ограничением частоты на весь бот и на каждый чат.
+    Если передан `outbox`, очередь доставляет записанные в него
+    уведомления и помечает их доставленными после отправки.
+    """
+
+    def __init__(self, bot, global_rate=TELEGRAM_GLOBAL_RATE,
+                 chat_rate=TELEGRAM_CHAT_RATE,
+                 coalesce_window=COALESCE_WINDOW, workers=OUTBOUND_WORKERS,
+                 outbox=None, redrain_interval=REDRAIN_INTERVAL):
+        self.bot = bot
+        self.outbox = outbox
+        self.redrain_interval = redrain_interval
+        self.in_flight = set()
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_rate = chat_rate
+        self.chat_buckets = {}
+        self.coalesce_window = coalesce_window
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='send'
+        )
+        self.pending = {}
+        self.loop = None
+        self.queue = None
+
+    def send_message(self, chat_id, text):
+        """Ставит сообщение в очередь; безопасно вызывать из любого потока."""
+        if self.loop is None:
+            raise MessageNotSend('Outbound queue is not running')
+        self.loop.call_soon_threadsafe(self._collect, chat_id, text)
+
+    def wake(self):
+        """Сообщает о новых записях в журнале; безопасно из любого потока."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._drain_outbox)
+
+    def _drain_outbox(self):
+        for key, chat_id, text in self.outbox.items():
+            if key not in self.in_flight:
+                self.in_flight.add(key)
+                self._collect(chat_id, text, key)
+
+    def _collect(self, chat_id, text, key=None):
+        if chat_id not in self.pending:
+            self.pending[chat_id] = []
+            self.loop.call_later(self.coalesce_window, self._release, chat_id)
+        self.pending[chat_id].append((text, key))
+
+    def _release(self, chat_id):
+        for text, keys in merge_messages(self.pending.pop(chat_id)):
+            self.queue.put_nowait((chat_id, text, keys))
+
+    def chat_bucket(self, chat_id):
+        """Возвращает ведро лимита для чата, создавая его при необходимости."""
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate)
+        return bucket
+
+    def prune(self):
+        """Удаляет вёдра простаивающих чатов."""
+        for chat_id in [
+            chat_id for chat_id, bucket in self.chat_buckets.items()
+            if bucket.is_full() and chat_id not in self.pending
+        ]:
+            del self.chat_buckets[chat_id]
+
+    async def deliver(self, chat_id, text):
+        """Доставляет сообщение с учётом лимитов и ответов 429.
+
+        Возвращает True, если сообщение доставлено.
+        """
+        for _ in range(MAX_RETRIES):
+            await asyncio.sleep(self.chat_bucket(chat_id).reserve())
+            await asyncio.sleep(self.global_bucket.reserve())
+            try:
+                await self.loop.run_in_executor(
+                    self.executor, deliver_message, self.bot, chat_id, text
+                )
+                return True
+            except MessageNotSend as error:
+                cause = error.__cause__
+                if not isinstance(cause, RetryAfter):
+                    logging.error(error)
+                    return False
+                logging.warning(
+                    f'Telegram throttled chat {chat_id}, '
+                    f'retry after {cause.retry_after} s'
+                )
+                await asyncio.sleep(cause.retry_after)
+        logging.error(f'Message to chat {chat_id} not delivered after retries')
+        return False
+
+    async def worker(self):
+        """Забирает сообщения из очереди и доставляет их."""
+        while True:
+            chat_id, text, keys = await self.queue.get()
+            try:
+                delivered = await self.deliver(chat_id, text)
+                self.in_flight.difference_update(keys)
+                if delivered and keys:
+                    self.outbox.ack(*keys)
+            finally:
+                self.queue.task_done()
+                if self.queue.empty():
+                    self.prune()
+
+    async def redrain(self):
+        """Периодически повторяет доставку оставшегося в журнале."""
+        while True:
+            self._drain_outbox()
+            await asyncio.sleep(self.redrain_interval)
+
+    async def run(self):
+        """Запускает обработчики очереди."""
+        self.loop = asyncio.get_event_loop()
+        self.queue = asyncio.Queue()
+        tasks = [self.worker() for _ in range(self.workers)]
+        if self.outbox is not None:
+            tasks.append(self.redrain())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            self.executor.shutdown(wait=False)
+
+    async def join(self):
+        """Ожидает доставки всех поставленных в очередь сообщений."""
+        while self.pending:
+            await asyncio.sleep(self.coalesce_window)
+        await self.queue.join()
@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from exceptions import MessageNotSend
+
+OUTBOX_PATH = os.getenv('OUTBOX_PATH', 'outbox.jsonl')
+FSYNC_INTERVAL = float(os.getenv('OUTBOX_FSYNC_INTERVAL', 1.0))
+FSYNC_BATCH_SIZE = int(os.getenv('OUTBOX_FSYNC_BATCH_SIZE', 100))
+DEDUP_HISTORY = int(os.getenv('OUTBOX_DEDUP_HISTORY', 10000))
+
+
+class Outbox:
+    """Журнал уведомлений на диске с доставкой хотя бы один раз.
+
+    Уведомление записывается в журнал до отправки и помечается
+    доставленным после неё. Журнал только дописывается; fsync
+    выполняется пакетно. Ключи недавно доставленных уведомлений
+    хранятся, чтобы после сбоя не отправить их повторно.
+    """
+
+    def __init__(self, path=OUTBOX_PATH, fsync_interval=FSYNC_INTERVAL,
+                 fsync_batch_size=FSYNC_BATCH_SIZE, history=DEDUP_HISTORY):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.fsync_batch_size = fsync_batch_size
+        self.history = history
+        self.pending = OrderedDict()
+        self.delivered = OrderedDict()
+        self.lock = threading.Lock()
+        self.records = self._replay()
+        self.file = open(path, 'a', encoding='utf-8')
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        if self._compaction_due():
+            self.compact()
+
+    def _compaction_due(self):
+        live = len(self.pending) + len(self.delivered)
+        return self.records > 2 * live + 1000
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return 0
+        records = 0
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logging.warning(f'Skipping damaged outbox record: {line}')
+                    continue
+                records += 1
+                if 'add' in record:
+                    self.pending[record['add']] = (
+                        record['chat'], record['text']
+                    )
+                else:
+                    self.pending.pop(record['ack'], None)
+                    self._remember(record['ack'])
+        return records
+
+    def _remember(self, key):
+        self.delivered[key] = None
+        self.delivered.move_to_end(key)
+        while len(self.delivered) > self.history:
+            self.delivered.popitem(last=False)
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.records += 1
+        self.unsynced += 1
+        due = (
+            self.unsynced >= self.fsync_batch_size
+            or time.monotonic() - self.last_sync >= self.fsync_interval
+        )
+        if due:
+            self._sync()
+
+    def _sync(self):
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def add(self, key, chat_id, text):
+        """Записывает уведомление в журнал.
+
+        Возвращает False, если уведомление с таким ключом уже ожидает
+        отправки или было доставлено.
+        """
+        with self.lock:
+            if key in self.pending or key in self.delivered:
+                return False
+            self._write({'add': key, 'chat': chat_id, 'text': text})
+            self.pending[key] = (chat_id, text)
+            return True
+
+    def ack(self, *keys):
+        """Помечает уведомления доставленными.
+
+        Когда устаревших записей в журнале становится больше, чем
+        актуальных, журнал сжимается.
+        """
+        with self.lock:
+            for key in keys:
+                if self.pending.pop(key, None) is not None:
+                    self._write({'ack': key})
+                    self._remember(key)
+            due = self._compaction_due()
+        if due:
+            self.compact()
+
+    def items(self):
+        """Возвращает ожидающие уведомления в порядке записи."""
+        with self.lock:
+            return [
+                (key, chat_id, text)
+                for key, (chat_id, text) in self.pending.items()
+            ]
+
+    def drain(self, send, deadline=None):
+        """Отправляет ожидающие уведомления через send(chat_id, text).
+
+        Останавливается на первой ошибке отправки или по наступлении
+        `deadline` (по time.monotonic), оставляя недоставленное
+        в журнале. Возвращает число доставленных.
+        """
+        delivered = 0
+        for key, chat_id, text in self.items():
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            try:
+                send(chat_id, text)
+            except MessageNotSend as error:
+                logging.error(f'Outbox drain stopped: {error}')
+                break
+            self.ack(key)
+            delivered += 1
+        return delivered
+
+    def compact(self):
+        """Переписывает журнал, оставляя только актуальные записи."""
+        with self.lock:
+            temporary = f'{self.path}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as file:
+                for key in self.delivered:
+                    file.write(json.dumps({'ack': key}) + '\n')
+                for key, (chat_id, text) in self.pending.items():
+                    file.write(json.dumps(
+                        {'add': key, 'chat': chat_id, 'text': text},
+                        ensure_ascii=False
+                    ) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+            self.file.close()
+            os.replace(temporary, self.path)
+            self.file = open(self.path, 'a', encoding='utf-8')
+            self.records = len(self.delivered) + len(self.pending)
+
+    def flush(self):
+        """Принудительно сбрасывает журнал на диск."""
+        with self.lock:
+            self._sync()
+
+    def close(self):
+        """Сбрасывает журнал и закрывает файл."""
+        self.flush()
+        self.file.close()
@@ -0,0 +1,108 @@
+import cProfile
+import logging
+import os
+import pstats
+import signal
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_CYCLES = int(os.getenv('PROFILE_CYCLES', 0))
+PROFILE_SIGNAL_CYCLES = int(os.getenv('PROFILE_SIGNAL_CYCLES', 5))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_TOP = 30
+TRACEMALLOC_FRAMES = 5
+
+
+class CycleProfiler:
+    """Профилирует несколько следующих циклов опроса по запросу.
+
+    Профилирование включается сигналом SIGUSR1 на `signal_cycles`
+    циклов или переменной окружения PROFILE_CYCLES с самого запуска.
+    На это время работают cProfile и tracemalloc; после последнего
+    цикла в `directory` записываются статистика по функциям
+    (`.pstats` и текстовая сводка) и места наибольших выделений
+    памяти. Пока профилирование не запрошено, цикл только проверяет
+    один счётчик. Циклы из разных потоков профилируются по очереди.
+    """
+
+    def __init__(self, cycles=PROFILE_CYCLES,
+                 signal_cycles=PROFILE_SIGNAL_CYCLES, directory=PROFILE_DIR):
+        self.requested = cycles
+        self.signal_cycles = signal_cycles
+        self.directory = directory
+        self.remaining = 0
+        self.profile = None
+        self.tracing = False
+        self.lock = threading.Lock()
+
+    def install(self, signum=getattr(signal, 'SIGUSR1', None)):
+        """Подписывается на сигнал включения профилирования."""
+        if signum is not None:
+            signal.signal(signum, self.request)
+        return self
+
+    def request(self, signum=None, frame=None):
+        """Запрашивает профилирование следующих циклов."""
+        self.requested = self.signal_cycles
+
+    @contextmanager
+    def cycle(self):
+        """Оборачивает один цикл опроса."""
+        if self.profile is None and not self.requested:
+            yield
+            return
+        self.lock.acquire()
+        if self.profile is None and not self.requested:
+            self.lock.release()
+            yield
+            return
+        try:
+            if self.profile is None:
+                self.start()
+            self.profile.enable()
+            try:
+                yield
+            finally:
+                self.profile.disable()
+                self.remaining -= 1
+                if self.remaining <= 0:
+                    self.dump()
+        finally:
+            self.lock.release()
+
+    def start(self):
+        """Начинает профилирование запрошенного числа циклов."""
+        self.remaining, self.requested = self.requested, 0
+        self.profile = cProfile.Profile()
+        self.tracing = not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        logging.info(f'Profiling next {self.remaining} cycles')
+
+    def dump(self):
+        """Записывает результаты профилирования и возвращает пути файлов."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        if self.tracing:
+            tracemalloc.stop()
+        os.makedirs(self.directory, exist_ok=True)
+        prefix = os.path.join(
+            self.directory,
+            time.strftime('cycles-%Y%m%d-%H%M%S') + f'-{os.getpid()}'
+        )
+        self.profile.dump_stats(f'{prefix}.pstats')
+        with open(f'{prefix}.txt', 'w', encoding='utf-8') as file:
+            stats = pstats.Stats(self.profile, stream=file)
+            stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+        with open(f'{prefix}-allocations.txt', 'w', encoding='utf-8') as file:
+            for statistic in snapshot.statistics('lineno')[:PROFILE_TOP]:
+                file.write(f'{statistic}\n')
+        self.profile = None
+        paths = [
+            f'{prefix}.pstats', f'{prefix}.txt', f'{prefix}-allocations.txt'
+        ]
+        logging.info(f'Profile written to {", ".join(paths)}')
+        return paths
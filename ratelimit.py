@@ -0,0 +1,154 @@
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+
+URGENT = 0
+NORMAL = 1
+SHARED_BUCKET_TIMEOUT = 30
+SHARED_BUCKET_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+)
+'''
+
+
+class TokenBucket:
+    """Ограничивает частоту событий алгоритмом token bucket.
+
+    `rate` — скорость пополнения в токенах в секунду, `capacity` —
+    допустимый всплеск.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', 'clock', 'lock')
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def reserve(self, tokens=1):
+        """Забирает токены и возвращает, сколько секунд нужно подождать."""
+        with self.lock:
+            self._refill()
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def try_acquire(self, tokens=1):
+        """Забирает токены, только если они доступны прямо сейчас."""
+        with self.lock:
+            self._refill()
+            if self.tokens < tokens:
+                return False
+            self.tokens -= tokens
+            return True
+
+    def is_full(self):
+        """Проверяет, что ведро полностью пополнено."""
+        with self.lock:
+            self._refill()
+            return self.tokens >= self.capacity
+
+
+class SharedTokenBucket:
+    """Token bucket, общий для процессов через файл SQLite.
+
+    Состояние ведра `name` хранится в таблице базы `path`; каждое
+    резервирование выполняется под блокировкой записи SQLite, поэтому
+    лимит соблюдается суммарно всеми процессами, открывшими базу.
+    """
+
+    def __init__(self, path, name, rate, capacity=None, clock=time.time):
+        self.name = name
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False,
+            timeout=SHARED_BUCKET_TIMEOUT
+        )
+        self.connection.execute(SHARED_BUCKET_SCHEMA)
+
+    def reserve(self, tokens=1):
+        """Забирает токены и возвращает, сколько секунд нужно подождать."""
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                row = self.connection.execute(
+                    'SELECT tokens, updated FROM buckets WHERE name = ?',
+                    (self.name,)
+                ).fetchone()
+                now = self.clock()
+                available, updated = row or (self.capacity, now)
+                available = min(
+                    self.capacity, available + (now - updated) * self.rate
+                ) - tokens
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO buckets (name, tokens, updated) '
+                    'VALUES (?, ?, ?)', (self.name, available, now)
+                )
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+            self.connection.execute('COMMIT')
+        if available >= 0:
+            return 0.0
+        return -available / self.rate
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        self.connection.close()
+
+
+class RateLimiter:
+    """Пропускает вызовы с частотой ведра, начиная с приоритетных.
+
+    Ожидающие вызовы выстраиваются по приоритету (меньше — раньше),
+    при равном приоритете — по времени прихода. Очередной вызов
+    ждёт токен, пока остальные стоят в очереди, поэтому пришедший
+    позже приоритетный вызов обгоняет ожидающих обычных.
+    """
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.queue = []
+        self.sequence = itertools.count()
+        self.busy = False
+        self.condition = threading.Condition()
+
+    def acquire(self, priority=NORMAL):
+        """Ждёт своей очереди и токена."""
+        ticket = (priority, next(self.sequence))
+        with self.condition:
+            heapq.heappush(self.queue, ticket)
+            while self.busy or self.queue[0] != ticket:
+                self.condition.wait()
+            heapq.heappop(self.queue)
+            self.busy = True
+        try:
+            delay = self.bucket.reserve()
+            if delay:
+                time.sleep(delay)
+        finally:
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+
+    def __len__(self):
+        return len(self.queue)
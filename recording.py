@@ -0,0 +1,54 @@
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+
+RECORD_FILE = os.getenv('RECORD_FILE')
+
+_file = None
+_lock = threading.Lock()
+
+
+def _open(path, mode):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def record(kind, **fields):
+    """Дописывает событие в журнал записи трафика, если он включён.
+
+    Журнал задаётся переменной RECORD_FILE; файл с расширением `.gz`
+    сжимается. Пока запись не включена, функция ничего не делает.
+    """
+    global _file
+    if RECORD_FILE is None:
+        return
+    line = json.dumps(
+        dict(kind=kind, time=round(time.time(), 3), **fields),
+        ensure_ascii=False, separators=(',', ':')
+    )
+    with _lock:
+        if _file is None:
+            _file = _open(RECORD_FILE, 'a')
+            atexit.register(close)
+        _file.write(line + '\n')
+
+
+def close():
+    """Закрывает журнал записи."""
+    global _file
+    with _lock:
+        if _file is not None:
+            _file.close()
+            _file = None
+
+
+def read_records(path):
+    """Читает события из журнала записи."""
+    with _open(path, 'r') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
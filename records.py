@@ -0,0 +1,53 @@
+import sys
+
+
+class Homework:
+    """Домашняя работа из ответа API.
+
+    Из словаря ответа при разборе берутся только нужные боту поля,
+    они хранятся в `__slots__` без словаря атрибутов. Статус
+    интернируется: у всех работ с одинаковым статусом это один
+    и тот же объект строки.
+    """
+
+    __slots__ = ('id', 'name', 'status', 'date_updated')
+
+    def __init__(self, id, name, status, date_updated=None):
+        self.id = id
+        self.name = name
+        self.status = sys.intern(status)
+        self.date_updated = date_updated
+
+    @classmethod
+    def from_dict(cls, data):
+        """Создаёт запись из словаря работы в ответе API."""
+        return cls(
+            data.get('id'), data['homework_name'], data['status'],
+            data.get('date_updated')
+        )
+
+    @property
+    def key(self):
+        """Ключ работы: её id, а при его отсутствии — название."""
+        if self.id is None:
+            return f'name:{self.name}'
+        return str(self.id)
+
+    @property
+    def state(self):
+        """Компактное состояние работы (status, date_updated)."""
+        return self.status, self.date_updated
+
+    def __eq__(self, other):
+        if not isinstance(other, Homework):
+            return NotImplemented
+        return (
+            (self.id, self.name, self.status, self.date_updated)
+            == (other.id, other.name, other.status, other.date_updated)
+        )
+
+    def __repr__(self):
+        return (
+            f'Homework(id={self.id!r}, name={self.name!r}, '
+            f'status={self.status!r}, date_updated={self.date_updated!r})'
+        )
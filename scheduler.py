@@ -0,0 +1,130 @@
+import os
+import random
+import time
+
+RETRY_TIME = 600
+REVIEWING_RETRY_TIME = int(os.getenv('REVIEWING_RETRY_TIME', 120))
+MAX_RETRY_TIME = int(os.getenv('MAX_RETRY_TIME', 3600))
+ERROR_RETRY_TIME = int(os.getenv('ERROR_RETRY_TIME', 60))
+BACKOFF_FACTOR = 2
+JITTER = 0.1
+SCHEDULER = os.getenv('SCHEDULER', 'adaptive')
+
+
+def parse_retry_after(response):
+    """Возвращает задержку из заголовка Retry-After в секундах или None."""
+    value = getattr(response, 'headers', {}).get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Scheduler:
+    """Определяет паузу перед следующим опросом API."""
+
+    def observe(self, homeworks=None, error=None):
+        """Учитывает результат очередного цикла опроса."""
+
+    def next_delay(self):
+        """Возвращает паузу перед следующим опросом в секундах."""
+        raise NotImplementedError
+
+    def urgent(self):
+        """Проверяет, что опрос срочный и должен идти вне очереди."""
+        return False
+
+
+class FixedScheduler(Scheduler):
+    """Опрашивает API с постоянным интервалом."""
+
+    def __init__(self, interval=RETRY_TIME):
+        self.interval = interval
+
+    def next_delay(self):
+        """Возвращает постоянный интервал."""
+        return self.interval
+
+
+class AdaptiveScheduler(Scheduler):
+    """Подстраивает интервал опроса под состояние работ и ошибки.
+
+    Пока хотя бы одна работа на ревью, опрашивает чаще. После ошибок
+    и пустых ответов интервал растёт экспоненциально со случайным
+    разбросом, заголовок Retry-After имеет приоритет.
+    """
+
+    def __init__(self, interval=RETRY_TIME,
+                 reviewing_interval=REVIEWING_RETRY_TIME,
+                 error_interval=ERROR_RETRY_TIME, max_interval=MAX_RETRY_TIME,
+                 factor=BACKOFF_FACTOR, jitter=JITTER):
+        self.interval = interval
+        self.reviewing_interval = reviewing_interval
+        self.error_interval = error_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.jitter = jitter
+        self.reviewing = set()
+        self.errors = 0
+        self.empty = 0
+        self.retry_after = None
+
+    def observe(self, homeworks=None, error=None):
+        """Учитывает статусы полученных работ `Homework` или ошибку запроса."""
+        self.retry_after = None
+        if error is not None:
+            self.errors += 1
+            self.retry_after = getattr(error, 'retry_after', None)
+            return
+        self.errors = 0
+        if not homeworks:
+            self.empty += 1
+            return
+        self.empty = 0
+        for homework in homeworks:
+            if homework.status == 'reviewing':
+                self.reviewing.add(homework.key)
+            else:
+                self.reviewing.discard(homework.key)
+
+    def urgent(self):
+        """Опрос срочный, пока хотя бы одна работа на ревью."""
+        return bool(self.reviewing)
+
+    def backoff(self, base, attempts):
+        """Возвращает экспоненциальную задержку с ограничением сверху."""
+        return min(self.max_interval, base * self.factor ** attempts)
+
+    def next_delay(self):
+        """Возвращает паузу с учётом ревью, ошибок и Retry-After."""
+        if self.retry_after is not None:
+            return self.retry_after
+        if self.errors:
+            delay = self.backoff(self.error_interval, self.errors - 1)
+        elif self.reviewing:
+            delay = self.reviewing_interval
+        else:
+            delay = self.backoff(self.interval, max(0, self.empty - 1))
+        spread = delay * self.jitter
+        return max(0.0, delay + random.uniform(-spread, spread))
+
+
+SCHEDULERS = {
+    'fixed': FixedScheduler,
+    'adaptive': AdaptiveScheduler,
+}
+
+
+def make_scheduler(name=SCHEDULER, **kwargs):
+    """Создаёт планировщик по имени из SCHEDULERS."""
+    if name not in SCHEDULERS:
+        raise KeyError(f'Unknown scheduler {name}')
+    return SCHEDULERS[name](**kwargs)
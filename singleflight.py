@@ -0,0 +1,58 @@
+import threading
+
+
+class _Call:
+    """Выполняющийся вызов."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Объединяет одновременные вызовы с одинаковым ключом в один.
+
+    Пока вызов для ключа выполняется, остальные потоки ждут его
+    результата или ошибки вместо повторного запроса. После завершения
+    вызова результат не запоминается: следующий вызов с тем же ключом
+    выполняется заново.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key, function, *args, **kwargs):
+        """Возвращает результат function(*args, **kwargs) для ключа.
+
+        Второе значение — True, если результат получен чужим вызовом.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = function(*args, **kwargs)
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+    def __len__(self):
+        return len(self.calls)
@@ -0,0 +1,13 @@
+def transitions(snapshot, homeworks):
+    """Находит работы, состояние которых отличается от снимка.
+
+    `snapshot` — `DedupCache` с отпечатками состояний, `homeworks` —
+    записи `records.Homework`. Лениво отдаёт тройки (ключ, новое
+    состояние, работа). Снимок не изменяется: новое состояние
+    запоминается вызывающим кодом после успешной доставки уведомления.
+    """
+    for homework in homeworks:
+        key = homework.key
+        state = homework.state
+        if not snapshot.seen(key, state):
+            yield key, state, homework
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+IMPORT_TIME_PREFIX = 'import time:'
+TOP_IMPORTS = 10
+PROFILE_TOKEN = '123456:profile-startup'
+
+
+def import_costs(module='homework'):
+    """Возвращает время импорта модуля и его прямых зависимостей.
+
+    Импорт измеряется в отдельном интерпретаторе через `-X importtime`,
+    чтобы уже загруженные модули не искажали результат. Возвращает
+    пары (модуль, секунды) от самых дорогих к дешёвым.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    costs = []
+    for line in result.stderr.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        _, cumulative, name = line[len(IMPORT_TIME_PREFIX):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        depth = len(name) - len(name.lstrip())
+        if depth <= 3:
+            costs.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(costs, key=lambda cost: cost[1], reverse=True)
+
+
+def measure(steps):
+    """Выполняет шаги инициализации и возвращает пары (шаг, секунды)."""
+    costs = []
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        costs.append((name, time.perf_counter() - start))
+    return costs
+
+
+def init_costs():
+    """Измеряет создание хранилищ и клиентов, которое делает main().
+
+    Клиенты создаются отдельно от общих, чтобы замер не менял
+    состояние `http_session`.
+    """
+    import homework
+    import http_session
+    from outbox import Outbox
+    from state import StateStore
+
+    with tempfile.TemporaryDirectory() as directory:
+        return measure([
+            ('StateStore', lambda: StateStore(
+                os.path.join(directory, 'state.sqlite3')
+            ).close()),
+            ('Outbox', lambda: Outbox(
+                os.path.join(directory, 'outbox.jsonl')
+            ).close()),
+            ('http_session.create_session',
+             lambda: http_session.create_session().close()),
+            ('telegram import and Bot', lambda: homework.telegram.Bot(
+                token=homework.TELEGRAM_TOKEN or PROFILE_TOKEN
+            )),
+        ])
+
+
+def profile_startup(module='homework', file=sys.stdout):
+    """Печатает время импорта и инициализации бота."""
+    imports = import_costs(module)
+    print(f'Import costs of {module}:', file=file)
+    for name, seconds in imports[:TOP_IMPORTS]:
+        print(f'  {name:<40} {seconds * 1000:8.1f} ms', file=file)
+    print('Initialization costs:', file=file)
+    for name, seconds in init_costs():
+        print(f'  {name:<40} {seconds * 1000:8.1f} ms', file=file)
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+STATE_DB = os.getenv('STATE_DB', 'state.sqlite3')
+COMMIT_INTERVAL = float(os.getenv('STATE_COMMIT_INTERVAL', 1.0))
+COMMIT_BATCH_SIZE = int(os.getenv('STATE_COMMIT_BATCH_SIZE', 500))
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS subscriptions (
+    key TEXT PRIMARY KEY,
+    from_date INTEGER,
+    last_send TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+'''
+
+
+def subscription_key(token, chat_id):
+    """Формирует ключ подписки, не раскрывая токен Практикума."""
+    digest = hashlib.sha256(str(token).encode()).hexdigest()[:16]
+    return f'{chat_id}:{digest}'
+
+
+class StateStore:
+    """Хранит метку from_date и отпечатки отправленного в SQLite.
+
+    База работает в режиме WAL, изменения копятся в памяти и
+    записываются одной транзакцией раз в `commit_interval` секунд
+    или по достижении `batch_size` изменений.
+    """
+
+    def __init__(self, path=STATE_DB, commit_interval=COMMIT_INTERVAL,
+                 batch_size=COMMIT_BATCH_SIZE):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(SCHEMA)
+        self.connection.commit()
+        self.commit_interval = commit_interval
+        self.batch_size = batch_size
+        self.pending = {}
+        self.last_commit = time.monotonic()
+        self.lock = threading.Lock()
+
+    def load(self, key):
+        """Возвращает (from_date, last_send, updated_at) подписки или None.
+
+        `updated_at` — время последнего сохранения по часам Unix.
+        """
+        with self.lock:
+            if key in self.pending:
+                from_date, last_send, updated_at = self.pending[key]
+                return from_date, json.loads(last_send), updated_at
+            row = self.connection.execute(
+                'SELECT from_date, last_send, updated_at FROM subscriptions '
+                'WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2]
+
+    def load_all(self):
+        """Возвращает состояния всех подписок одним запросом."""
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT key, from_date, last_send, updated_at '
+                'FROM subscriptions'
+            ).fetchall()
+            states = {
+                key: (from_date, json.loads(last_send), updated_at)
+                for key, from_date, last_send, updated_at in rows
+            }
+            for key, (from_date, last_send, updated_at) in (
+                self.pending.items()
+            ):
+                states[key] = (from_date, json.loads(last_send), updated_at)
+        return states
+
+    def save(self, key, from_date, last_send):
+        """Запоминает состояние подписки до ближайшей пакетной записи."""
+        with self.lock:
+            self.pending[key] = (
+                from_date, json.dumps(last_send, ensure_ascii=False),
+                time.time()
+            )
+            due = (
+                len(self.pending) >= self.batch_size
+                or time.monotonic() - self.last_commit >= self.commit_interval
+            )
+            if due:
+                self._commit()
+
+    def flush(self):
+        """Записывает накопленные изменения на диск."""
+        with self.lock:
+            self._commit()
+
+    def _commit(self):
+        if self.pending:
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO subscriptions '
+                    '(key, from_date, last_send, updated_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    [(key, *state) for key, state in self.pending.items()]
+                )
+            self.pending.clear()
+        self.last_commit = time.monotonic()
+
+    def close(self):
+        """Сбрасывает изменения и закрывает базу."""
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,135 @@
+import codecs
+import json
+
+CHUNK_SIZE = 16 * 1024
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+class HomeworkStream:
+    """Потоково разбирает ответ API со списком домашних работ.
+
+    Читает тело ответа по частям и отдаёт работы из `homeworks`
+    по одной, не загружая весь ответ в память. Остальные ключи
+    верхнего уровня, например `current_date`, доступны через `get`
+    после того, как поток прочитан до конца. Ошибки структуры ответа
+    повторяют `check_response`: KeyError и TypeError.
+    """
+
+    def __init__(self, chunks, close=None):
+        self.chunks = iter(chunks)
+        self.close = close
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.exhausted = False
+        self.meta = {}
+        self.count = 0
+        self.consumed = False
+
+    def __iter__(self):
+        if self.consumed:
+            raise RuntimeError('Homework stream can be read only once')
+        self.consumed = True
+        try:
+            yield from self._parse()
+        finally:
+            if self.close is not None:
+                self.close()
+
+    def __len__(self):
+        return self.count
+
+    def get(self, key, default=None):
+        """Возвращает значение ключа верхнего уровня ответа."""
+        return self.meta.get(key, default)
+
+    def _more(self):
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+        for chunk in self.chunks:
+            if isinstance(chunk, bytes):
+                chunk = self.decoder.decode(chunk)
+            if chunk:
+                self.buffer += chunk
+                return True
+        self.buffer += self.decoder.decode(b'', final=True)
+        self.exhausted = True
+        return False
+
+    def _peek(self):
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._more():
+                return ''
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char not in chars or not char:
+            raise ValueError(
+                f'Malformed API response: expected one of {chars!r}, '
+                f'got {char!r}'
+            )
+        self.position += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except ValueError:
+                if self._more():
+                    continue
+                raise
+            if end < len(self.buffer) or self.exhausted:
+                self.position = end
+                return value
+            self._more()
+
+    def _parse(self):
+        if self._peek() != '{':
+            raise TypeError(
+                'Wrong type response.'
+                'Should have come dict but came another JSON value'
+            )
+        self.position += 1
+        if self._peek() == '}':
+            raise KeyError('Empty dictionary')
+        found = False
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == 'homeworks':
+                found = True
+                yield from self._homeworks()
+            else:
+                self.meta[key] = self._value()
+            if self._expect(',}') == '}':
+                break
+        if not found:
+            raise KeyError('Key homeworks missing')
+
+    def _homeworks(self):
+        if self._peek() != '[':
+            raise TypeError(
+                'Wrong type homeworks.'
+                'Should have come list but came another JSON value'
+            )
+        self.position += 1
+        if self._peek() == ']':
+            self.position += 1
+            return
+        while True:
+            homework = self._value()
+            self.count += 1
+            yield homework
+            if self._expect(',]') == ']':
+                return
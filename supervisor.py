@@ -0,0 +1,212 @@
+import glob
+import hashlib
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from bisect import bisect
+
+from dotenv import load_dotenv
+
+import metrics
+from lifecycle import GracefulShutdown
+from log_config import LOG_FILE, configure_logging
+from outbound import TELEGRAM_GLOBAL_RATE
+from outbox import OUTBOX_PATH, Outbox
+
+load_dotenv()
+
+WORKERS = int(os.getenv('WORKERS', 0)) or os.cpu_count() or 1
+RING_REPLICAS = 100
+RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 60.0
+CHECK_INTERVAL = 1.0
+
+
+def _point(value):
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing:
+    """Кольцо консистентного хеширования ключей по воркерам.
+
+    Каждый воркер занимает `replicas` точек кольца, ключ достаётся
+    ближайшей по часовой стрелке точке. При добавлении или удалении
+    воркера переезжает лишь около 1/N ключей.
+    """
+
+    def __init__(self, nodes, replicas=RING_REPLICAS):
+        points = sorted(
+            (_point(f'{node}:{replica}'), node)
+            for node in nodes for replica in range(replicas)
+        )
+        self.points = [point for point, _ in points]
+        self.nodes = [node for _, node in points]
+
+    def node_for(self, key):
+        """Возвращает воркер, отвечающий за ключ."""
+        index = bisect(self.points, _point(key)) % len(self.points)
+        return self.nodes[index]
+
+
+def shard(subscriptions, workers):
+    """Распределяет подписки по воркерам 0..workers-1.
+
+    Подписки делятся по токену, чтобы чаты одного токена попадали
+    в один воркер и опрашивались одним запросом.
+    """
+    ring = HashRing(range(workers))
+    shards = {index: [] for index in range(workers)}
+    for subscription in subscriptions:
+        shards[ring.node_for(subscription.token)].append(subscription)
+    return shards
+
+
+def worker_path(path, index):
+    """Возвращает путь файла воркера: `outbox.jsonl` → `outbox-1.jsonl`."""
+    root, extension = os.path.splitext(path)
+    return f'{root}-{index}{extension}'
+
+
+def adopt_orphans(workers, path=OUTBOX_PATH):
+    """Передаёт недоставленное из журналов лишних воркеров оставшимся.
+
+    Вызывается до запуска воркеров, когда их число уменьшилось.
+    """
+    root, extension = os.path.splitext(path)
+    for orphan in glob.glob(f'{root}-*{extension}'):
+        suffix = orphan[len(root) + 1:len(orphan) - len(extension)]
+        if not suffix.isdigit() or int(suffix) < workers:
+            continue
+        source = Outbox(orphan)
+        target = Outbox(worker_path(path, int(suffix) % workers))
+        for key, chat_id, text in source.items():
+            target.add(key, chat_id, text)
+        target.close()
+        source.close()
+        os.remove(orphan)
+        logging.info(f'Outbox {orphan} adopted by another worker')
+
+
+def load_all_subscriptions():
+    """Читает подписки из SUBSCRIPTIONS_FILE или из переменных бота."""
+    from engine import SUBSCRIPTIONS_FILE, Subscription, load_subscriptions
+    from homework import PRACTICUM_TOKEN, TELEGRAM_CHAT_ID
+
+    if os.path.exists(SUBSCRIPTIONS_FILE):
+        return load_subscriptions(SUBSCRIPTIONS_FILE)
+    if PRACTICUM_TOKEN and TELEGRAM_CHAT_ID:
+        return [Subscription(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)]
+    raise KeyError('No subscriptions')
+
+
+def run_worker(index, workers):
+    """Опрашивает подписки, доставшиеся воркеру index."""
+    import engine
+
+    configure_logging(
+        filename=worker_path(LOG_FILE, index), level=logging.INFO
+    )
+    subscriptions = shard(load_all_subscriptions(), workers)[index]
+    logging.info(
+        f'Worker {index}/{workers} polls {len(subscriptions)} subscriptions'
+    )
+    port = metrics.METRICS_PORT
+    engine.main(
+        subscriptions, outbox_path=worker_path(OUTBOX_PATH, index),
+        global_rate=TELEGRAM_GLOBAL_RATE / workers,
+        metrics_port=None if port is None else int(port) + index
+    )
+
+
+class Supervisor:
+    """Запускает воркеры в отдельных процессах и перезапускает упавшие.
+
+    Подписки делятся между воркерами консистентным хешированием,
+    состояние подписок воркеры читают из общей базы `StateStore`,
+    поэтому при изменении числа воркеров подписка продолжает опрос
+    в новом процессе с того же места. Сигнал SIGUSR1 передаётся
+    воркерам и включает в них профилирование циклов опроса.
+    """
+
+    def __init__(self, workers=WORKERS, target=run_worker,
+                 context=None, shutdown=None):
+        self.workers = workers
+        self.target = target
+        self.context = context or multiprocessing.get_context('spawn')
+        self.shutdown = shutdown or GracefulShutdown()
+        self.processes = {}
+        self.started = {}
+        self.delays = {}
+        self.restart_at = {}
+
+    def start(self, index):
+        """Запускает воркер index."""
+        process = self.context.Process(
+            target=self.target, args=(index, self.workers),
+            name=f'worker-{index}'
+        )
+        process.start()
+        self.processes[index] = process
+        self.started[index] = time.monotonic()
+        self.restart_at.pop(index, None)
+
+    def check(self):
+        """Планирует и выполняет перезапуск завершившихся воркеров."""
+        now = time.monotonic()
+        for index, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            if index not in self.restart_at:
+                if now - self.started[index] > MAX_RESTART_DELAY:
+                    self.delays[index] = RESTART_DELAY
+                delay = self.delays.get(index, RESTART_DELAY)
+                self.delays[index] = min(MAX_RESTART_DELAY, delay * 2)
+                self.restart_at[index] = now + delay
+                logging.error(
+                    f'Worker {index} exited with code {process.exitcode}, '
+                    f'restarting in {delay:.0f} s'
+                )
+            elif now >= self.restart_at[index]:
+                self.start(index)
+
+    def forward(self, signum, frame=None):
+        """Передаёт сигнал всем работающим воркерам."""
+        for process in self.processes.values():
+            if process.is_alive():
+                os.kill(process.pid, signum)
+
+    def stop(self):
+        """Останавливает воркеры, дав им время завершиться."""
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes.values():
+            process.join(self.shutdown.remaining())
+            if process.is_alive():
+                logging.warning(f'Killing {process.name}')
+                process.kill()
+                process.join()
+
+    def run(self):
+        """Работает до сигнала остановки."""
+        self.shutdown.install()
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, self.forward)
+        adopt_orphans(self.workers)
+        for index in range(self.workers):
+            self.start(index)
+        logging.info(f'Supervisor started {self.workers} workers')
+        try:
+            while not self.shutdown.wait(CHECK_INTERVAL):
+                self.check()
+        finally:
+            self.stop()
+
+
+if __name__ == '__main__':
+    configure_logging(level=logging.INFO)
+    Supervisor().run()
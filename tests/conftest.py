@@ -1,9 +1,20 @@
 import sys
 from os.path import abspath, dirname
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 
 pytest_plugins = [
     'tests.fixtures.fixture_data'
 ]
+
+
+@pytest.fixture(autouse=True)
+def reset_http_session():
+    """Закрывает общую HTTP-сессию, настроенную тестом."""
+    yield
+    import http_session
+
+    http_session.close()
@@ -0,0 +1,76 @@
+import pytest
+import telegram
+
+import homework
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from exceptions import CircuitOpenError, HTTPRequestError, ServerError
+from scheduler import AdaptiveScheduler
+
+
+def fail():
+    raise ServerError('down')
+
+
+class TestCircuitBreaker:
+
+    def make_breaker(self, now):
+        return CircuitBreaker(
+            'test', failures=2, reset_timeout=30,
+            is_failure=lambda error: isinstance(error, ServerError),
+            clock=lambda: now[0]
+        )
+
+    def test_opens_after_failures_and_sheds_calls(self):
+        now = [0.0]
+        breaker = self.make_breaker(now)
+        for _ in range(2):
+            with pytest.raises(ServerError):
+                breaker.call(fail)
+        assert breaker.state == OPEN
+        calls = []
+        with pytest.raises(CircuitOpenError) as info:
+            breaker.call(calls.append, 1)
+        assert calls == [], 'Разомкнутая цепь не должна вызывать сервис'
+        assert info.value.retry_after == 30
+        scheduler = AdaptiveScheduler()
+        scheduler.observe(error=info.value)
+        assert scheduler.next_delay() == 30, (
+            'Планировщик должен ждать до пробного запроса'
+        )
+
+    def test_half_open_allows_single_probe(self):
+        now = [0.0]
+        breaker = self.make_breaker(now)
+        for _ in range(2):
+            with pytest.raises(ServerError):
+                breaker.call(fail)
+        now[0] = 31
+        breaker.allow()
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.allow()
+        breaker.record(ServerError('still down'))
+        assert breaker.state == OPEN
+        now[0] = 62
+        assert breaker.call(lambda: 'ok') == 'ok'
+        assert breaker.state == CLOSED
+
+    def test_other_errors_keep_circuit_closed(self):
+        breaker = self.make_breaker([0.0])
+        for _ in range(3):
+            with pytest.raises(KeyError):
+                breaker.call({}.__getitem__, 'missing')
+        assert breaker.state == CLOSED
+
+    def test_upstream_failures(self):
+        assert homework.practicum_failure(ServerError())
+        assert homework.practicum_failure(
+            HTTPRequestError(status_code=503)
+        )
+        assert not homework.practicum_failure(
+            HTTPRequestError(status_code=401)
+        )
+        assert homework.telegram_failure(telegram.error.TimedOut())
+        assert not homework.telegram_failure(
+            telegram.error.BadRequest('chat not found')
+        )
@@ -0,0 +1,37 @@
+from dedup import ENTRY_SIZE, DedupCache
+
+
+class TestDedupCache:
+
+    def test_stores_fixed_size_fingerprints(self):
+        cache = DedupCache()
+        message = 'Изменился статус проверки работы "hw". ' * 20
+        cache.remember('hw', message)
+        assert cache.seen('hw', message)
+        assert not cache.seen('hw', 'другое сообщение')
+        assert cache['hw'].bit_length() <= 64
+
+    def test_lru_eviction(self):
+        cache = DedupCache(max_bytes=2 * ENTRY_SIZE)
+        cache.remember('a', 1)
+        cache.remember('b', 2)
+        assert cache.seen('a', 1)
+        cache.remember('c', 3)
+        assert list(cache) == ['a', 'c'], 'Вытесняется давно не нужная запись'
+        assert cache.evictions['lru'] == 1
+
+    def test_ttl_eviction(self):
+        now = [0.0]
+        cache = DedupCache(ttl=10, clock=lambda: now[0])
+        cache.remember('a', 1)
+        now[0] = 11.0
+        assert not cache.seen('a', 1)
+        assert cache.evictions['ttl'] == 1
+        assert DedupCache.totals['ttl'] >= 1
+
+    def test_forget(self):
+        cache = DedupCache()
+        cache.remember('error', 'сбой')
+        cache.forget('error')
+        cache.forget('error')
+        assert not cache.seen('error', 'сбой')
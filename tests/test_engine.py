@@ -0,0 +1,146 @@
+import asyncio
+import os
+
+import engine
+import homework
+from error_digest import ErrorDigest
+from exceptions import ServerError
+from profiling import CycleProfiler
+from utils import MockBot
+from watermark import WATERMARK_OVERLAP
+
+
+class TestEngine:
+
+    def test_load_subscriptions(self, tmp_path):
+        path = tmp_path / 'subscriptions.txt'
+        path.write_text('# comment\ntoken1 101\n\ntoken2 102\n')
+        subscriptions = engine.load_subscriptions(path)
+        assert [s.chat_id for s in subscriptions] == ['101', '102']
+        assert subscriptions[0].headers == {'Authorization': 'OAuth token1'}
+
+    def test_poll_once_notifies_subscription(self, monkeypatch):
+        def fake_fetch(current_timestamp, headers, deadline=None):
+            return {
+                'homeworks': [{'homework_name': headers['Authorization'],
+                               'status': 'approved'}],
+                'current_date': 1000,
+            }
+
+        monkeypatch.setattr(homework, 'fetch_api_answer', fake_fetch)
+
+        bot = MockBot()
+        subscriptions = [
+            engine.Subscription('a', 1, timestamp=0),
+            engine.Subscription('b', 2, timestamp=0)
+        ]
+        polling = engine.PollingEngine(bot, subscriptions, concurrency=2)
+
+        async def run():
+            polling.semaphore = asyncio.Semaphore(2)
+            await asyncio.gather(*map(polling.poll_once, polling.groups))
+
+        asyncio.get_event_loop().run_until_complete(run())
+        assert sorted(chat for chat, _ in bot.sent) == [1, 2]
+        assert all(
+            s.timestamp == 1000 - WATERMARK_OVERLAP for s in subscriptions
+        )
+
+    def test_stop_ends_polling(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            homework, 'fetch_api_answer',
+            lambda current_timestamp, headers, deadline=None: calls.append(headers) or {
+                'homeworks': [], 'current_date': 42
+            }
+        )
+        subscriptions = [engine.Subscription('c', 3)]
+        polling = engine.PollingEngine(
+            MockBot(), subscriptions, concurrency=1, start_window=0
+        )
+
+        async def run():
+            task = asyncio.ensure_future(polling.run())
+            while not calls:
+                await asyncio.sleep(0.01)
+            polling.stop()
+            await asyncio.wait_for(task, 1)
+
+        asyncio.get_event_loop().run_until_complete(run())
+        assert len(calls) == 1
+
+    def test_shared_token_makes_one_request(self, monkeypatch):
+        calls = []
+
+        def fake_fetch(current_timestamp, headers, deadline=None):
+            calls.append(current_timestamp)
+            return {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': 4200,
+            }
+
+        monkeypatch.setattr(homework, 'fetch_api_answer', fake_fetch)
+        bot = MockBot()
+        subscriptions = [
+            engine.Subscription('shared', chat_id, timestamp=chat_id * 100)
+            for chat_id in (1, 2, 3)
+        ]
+        polling = engine.PollingEngine(bot, subscriptions, concurrency=3)
+        assert len(polling.groups) == 1
+
+        async def run():
+            polling.semaphore = asyncio.Semaphore(3)
+            for _ in range(3):
+                await polling.poll_once(polling.groups[0])
+
+        asyncio.get_event_loop().run_until_complete(run())
+        assert calls == [100, 4200 - WATERMARK_OVERLAP,
+                         4200 - WATERMARK_OVERLAP], (
+            'Один токен должен запрашиваться одним запросом за цикл '
+            'с наименьшей меткой группы'
+        )
+        assert sorted(chat for chat, _ in bot.sent) == [1, 2, 3]
+        assert {s.timestamp for s in subscriptions} == {
+            4200 - WATERMARK_OVERLAP
+        }, 'Метки подписок одного токена должны совпасть'
+
+    def test_shared_error_reported_to_every_chat(self, monkeypatch):
+        calls = []
+
+        def failing(current_timestamp, headers, deadline=None):
+            calls.append(current_timestamp)
+            raise ServerError('down')
+
+        monkeypatch.setattr(homework, 'fetch_api_answer', failing)
+        monkeypatch.setattr(homework, 'error_digest', ErrorDigest())
+        bot = MockBot()
+        subscriptions = [
+            engine.Subscription('failing', chat_id, timestamp=0)
+            for chat_id in (1, 2)
+        ]
+        polling = engine.PollingEngine(bot, subscriptions, concurrency=1)
+        polling.process(polling.groups[0])
+        assert len(calls) == 1
+        assert sorted(chat for chat, _ in bot.sent) == [1, 2]
+
+    def test_streaming_subscriptions_are_not_grouped(self):
+        subscriptions = [
+            engine.Subscription('shared', chat_id) for chat_id in (1, 2)
+        ]
+        assert len(engine.group_by_token(subscriptions)) == 1
+        assert len(engine.group_by_token(subscriptions, stream=True)) == 2
+
+    def test_cycles_run_under_profiler(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(
+            homework, 'fetch_api_answer',
+            lambda current_timestamp, headers, deadline=None: {
+                'homeworks': [], 'current_date': 42
+            }
+        )
+        profiler = CycleProfiler(cycles=1, directory=tmp_path)
+        polling = engine.PollingEngine(
+            MockBot(), [engine.Subscription('profiled', 1)],
+            profiler=profiler
+        )
+        polling.process(polling.groups[0])
+        assert len(os.listdir(tmp_path)) == 3
@@ -0,0 +1,99 @@
+import homework
+from dedup import DedupCache
+from error_digest import ErrorDigest, fingerprint
+from exceptions import HTTPRequestError, ServerError
+from outbox import Outbox
+from scheduler import FixedScheduler
+from singleflight import SingleFlight
+from utils import MockBot
+
+
+class TestErrorDigest:
+
+    def test_fingerprint_ignores_varying_parts(self):
+        first = ServerError(
+            "timeout!!! Adress: https://practicum.yandex.ru/api/ with "
+            "headers: {'Authorization': 'OAuth a'} and parameters: "
+            "{'from_date': 1000} does not answer"
+        )
+        second = ServerError(
+            "timeout!!! Adress: https://practicum.yandex.ru/api/ with "
+            "headers: {'Authorization': 'OAuth b'} and parameters: "
+            "{'from_date': 1600} does not answer"
+        )
+        assert fingerprint(first) == fingerprint(second)
+        assert fingerprint(first) != fingerprint(HTTPRequestError('x'))
+        assert 'OAuth' not in fingerprint(first)[1]
+
+    def test_digest_after_window(self):
+        now = [0.0]
+        errors = ErrorDigest(window=3600, clock=lambda: now[0])
+        key = fingerprint(ServerError('down'))
+        assert errors.add(1, key)
+        assert not any(errors.add(1, key) for _ in range(36))
+        assert errors.flush(1) is None, 'Сводка отправляется по окончании окна'
+        now[0] = 3600
+        started, summary = errors.flush(1)
+        assert started == 0
+        assert 'ServerError ×37' in summary
+        assert 'последние 60 мин.' in summary
+        assert errors.flush(1) is None
+        assert errors.add(1, key), 'В новом окне ошибка сообщается сразу'
+
+    def test_flapping_upstream_reported_once(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(
+            homework, 'error_digest',
+            ErrorDigest(window=3600, clock=lambda: now[0])
+        )
+        monkeypatch.setattr(homework, 'flights', SingleFlight())
+        monkeypatch.setattr(
+            homework, 'api_limiter',
+            homework.make_api_limiter(rate=1000, burst=1000)
+        )
+        answers = iter(range(11))
+
+        def flapping(current_timestamp, headers, deadline=None):
+            number = next(answers)
+            if number % 2:
+                return {'homeworks': [], 'current_date': current_timestamp}
+            raise ServerError(f'connection reset, attempt {number}')
+
+        monkeypatch.setattr(homework, 'fetch_api_answer', flapping)
+        bot = MockBot()
+        last_send = DedupCache()
+        for _ in range(10):
+            homework.poll_homeworks(
+                bot, 7, {'Authorization': 'OAuth flap'}, 0, last_send,
+                FixedScheduler()
+            )
+        assert len(bot.sent) == 1, 'Повторы одной ошибки не должны слаться'
+        now[0] = 3600
+        homework.poll_homeworks(
+            bot, 7, {'Authorization': 'OAuth flap'}, 0, last_send,
+            FixedScheduler()
+        )
+        assert len(bot.sent) == 2
+        assert 'ServerError ×6' in bot.sent[1][1]
+
+    def test_equal_digests_of_two_windows_are_queued(self, monkeypatch,
+                                                     tmp_path):
+        now = [0.0]
+        monkeypatch.setattr(
+            homework, 'error_digest',
+            ErrorDigest(window=3600, clock=lambda: now[0])
+        )
+        outbox = Outbox(tmp_path / 'outbox.jsonl')
+        sent = []
+        for window in range(2):
+            for _ in range(3):
+                homework.error_digest.add(7, fingerprint(ServerError('down')))
+            now[0] += 3600
+            homework.send_error_digest(None, 7, outbox)
+            assert len(outbox.items()) == 1, (
+                'Одинаковая сводка следующего окна не должна теряться'
+            )
+            outbox.drain(lambda chat_id, text: sent.append((chat_id, text)))
+        outbox.close()
+        assert len(sent) == 2
+        assert all('ServerError ×3' in text for _, text in sent)
@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+import http_session
+
+
+class TestHttpSession:
+
+    def test_get_without_session_uses_requests(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            requests, 'get', lambda url, **kwargs: calls.append(kwargs)
+        )
+        http_session.close()
+        http_session.get('https://example.com', params={'a': 1})
+        assert calls[0]['timeout'] == (
+            http_session.HTTP_CONNECT_TIMEOUT, http_session.HTTP_READ_TIMEOUT
+        )
+
+    def test_configure_mounts_pooled_adapter(self):
+        session = http_session.configure(pool_size=7, retries=2)
+        try:
+            adapter = session.get_adapter('https://practicum.yandex.ru')
+            assert adapter._pool_maxsize == 7
+            assert adapter.max_retries.total == 2
+            assert 'GET' in adapter.max_retries.allowed_methods
+        finally:
+            http_session.close()
+
+    def test_split_budget_fits_retries(self):
+        assert http_session.split_budget(
+            100, retries=3, backoff_factor=0.5
+        ) == (
+            http_session.HTTP_CONNECT_TIMEOUT, http_session.HTTP_READ_TIMEOUT
+        )
+        for budget in (8, 30):
+            connect, read = http_session.split_budget(
+                budget, retries=3, backoff_factor=0.5
+            )
+            worst = 4 * (connect + read) + http_session.backoff_total(3, 0.5)
+            assert worst <= budget, (
+                'Все попытки вместе с паузами между ними должны '
+                'укладываться в бюджет цикла'
+            )
+
+    def test_close_restores_defaults(self):
+        http_session.configure(read_timeout=1, retries=5)
+        http_session.close()
+        assert http_session._timeout == (
+            http_session.HTTP_CONNECT_TIMEOUT, http_session.HTTP_READ_TIMEOUT
+        )
+        assert http_session._retries == 0
+
+    def test_deadline_bounds_stuck_request(self, monkeypatch):
+        release = threading.Event()
+        monkeypatch.setattr(
+            requests, 'get', lambda url, **kwargs: release.wait(5)
+        )
+        http_session.close()
+        start = time.monotonic()
+        with pytest.raises(requests.Timeout):
+            http_session.get(
+                'https://example.com', deadline=time.monotonic() + 0.2,
+                hedge_percentile=0
+            )
+        release.set()
+        assert time.monotonic() - start < 1
+
+    def test_abandoned_request_does_not_block_exit(self):
+        script = (
+            'import time, requests, http_session\n'
+            'requests.get = lambda url, **kwargs: time.sleep(5)\n'
+            'try:\n'
+            '    http_session.get("https://example.com",'
+            ' deadline=time.monotonic() + 0.2)\n'
+            'except requests.Timeout:\n'
+            '    pass\n'
+        )
+        start = time.monotonic()
+        subprocess.run(
+            [sys.executable, '-c', script], check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        assert time.monotonic() - start < 3, (
+            'Брошенная по дедлайну попытка не должна задерживать выход'
+        )
+
+    def test_hedged_request_returns_first_answer(self, monkeypatch):
+        calls = []
+
+        def slow_then_fast(url, **kwargs):
+            calls.append(url)
+            if len(calls) == 1:
+                time.sleep(0.5)
+                return 'slow'
+            return 'fast'
+
+        monkeypatch.setattr(requests, 'get', slow_then_fast)
+        monkeypatch.setattr(
+            http_session, 'latencies', http_session.LatencyWindow()
+        )
+        for _ in range(http_session.HEDGE_MIN_SAMPLES):
+            http_session.latencies.add(0.05)
+        http_session.close()
+        assert http_session.get(
+            'https://example.com', hedge_percentile=95
+        ) == 'fast'
+        assert len(calls) == 2
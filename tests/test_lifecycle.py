@@ -0,0 +1,42 @@
+import time
+
+from lifecycle import GracefulShutdown, resume_delay
+from outbox import Outbox
+
+
+class TestLifecycle:
+
+    def test_resume_delay(self):
+        assert resume_delay(1000, 600, now=1200) == 400, (
+            'Опрос должен продолжиться по прежнему расписанию'
+        )
+        assert resume_delay(1000, 600, now=5000) == 0, (
+            'Просроченный опрос должен выполняться сразу'
+        )
+
+    def test_shutdown_interrupts_wait(self):
+        shutdown = GracefulShutdown(timeout=5)
+        calls = []
+        shutdown.on_request(lambda: calls.append(True))
+        assert not shutdown.wait(0)
+        assert shutdown.remaining() == 5
+        shutdown.request()
+        shutdown.request()
+        assert calls == [True], 'Колбэки вызываются один раз'
+        start = time.monotonic()
+        assert shutdown.wait(10)
+        assert time.monotonic() - start < 1
+        assert 0 < shutdown.remaining() <= 5
+
+    def test_drain_stops_at_deadline(self, tmp_path):
+        outbox = Outbox(tmp_path / 'outbox.jsonl')
+        outbox.add('a', 1, 'first')
+        outbox.add('b', 1, 'second')
+        sent = []
+        assert outbox.drain(
+            lambda chat_id, text: sent.append(text),
+            deadline=time.monotonic() - 1
+        ) == 0
+        assert outbox.drain(lambda chat_id, text: sent.append(text)) == 2
+        assert sent == ['first', 'second']
+        outbox.close()
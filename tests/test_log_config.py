@@ -0,0 +1,48 @@
+import gzip
+import logging
+
+import log_config
+
+
+def make_record(message, level=logging.DEBUG):
+    return logging.LogRecord('bot', level, __file__, 1, message, None, None)
+
+
+class TestLogConfig:
+
+    def test_sampling_filter(self):
+        sampling = log_config.SamplingFilter(every=3)
+        passed = [
+            sampling.filter(make_record('Ответ API пуст')) for _ in range(7)
+        ]
+        assert passed == [True, False, False, True, False, False, True]
+        assert sampling.filter(make_record('Сбой', logging.ERROR))
+
+    def test_rotated_files_are_compressed(self, tmp_path):
+        path = tmp_path / 'main.log'
+        handler = log_config.make_file_handler(
+            str(path), max_bytes=100, backup_count=2, when=None,
+            compress=True
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        for number in range(10):
+            handler.emit(make_record(f'line {number} ' * 5, logging.INFO))
+        handler.close()
+        rotated = tmp_path / 'main.log.1.gz'
+        assert rotated.exists()
+        assert b'line' in gzip.decompress(rotated.read_bytes())
+
+    def test_pipeline_writes_from_background(self, tmp_path):
+        path = tmp_path / 'main.log'
+        root = logging.getLogger()
+        saved = root.handlers[:], root.level
+        listener = log_config.configure_logging(
+            filename=str(path), stream=None
+        )
+        try:
+            logging.info('через очередь')
+        finally:
+            listener.stop()
+            root.handlers[:], level = saved
+            root.setLevel(level)
+        assert 'через очередь' in path.read_text(encoding='utf-8')
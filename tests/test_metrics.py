@@ -0,0 +1,48 @@
+import urllib.request
+
+import metrics
+
+
+class TestMetrics:
+
+    def test_histogram_render(self):
+        registry = metrics.Registry()
+        histogram = metrics.Histogram(
+            'test_seconds', 'Test.', buckets=(0.1, 1), registry=registry
+        )
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+        text = registry.render()
+        assert 'test_seconds_bucket{le="0.1"} 1' in text
+        assert 'test_seconds_bucket{le="1"} 2' in text
+        assert 'test_seconds_bucket{le="+Inf"} 3' in text
+        assert 'test_seconds_count 3' in text
+
+    def test_counter_and_gauge(self):
+        registry = metrics.Registry()
+        counter = metrics.Counter(
+            'test_errors_total', 'Test.', labelnames=('type',),
+            registry=registry
+        )
+        gauge = metrics.Gauge(
+            'test_depth', 'Test.', labelnames=('queue',), registry=registry
+        )
+        counter.inc(type='KeyError')
+        counter.inc(type='KeyError')
+        gauge.set_function(lambda: 7, queue='outbox')
+        text = registry.render()
+        assert 'test_errors_total{type="KeyError"} 2' in text
+        assert 'test_depth{queue="outbox"} 7' in text
+
+    def test_server(self):
+        server = metrics.start_server(port=0, host='127.0.0.1')
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(
+                f'http://127.0.0.1:{port}/metrics'
+            ) as response:
+                assert b'poll_cycle_seconds' in response.read()
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,65 @@
+import asyncio
+
+from outbound import OutboundQueue, merge_messages
+from outbox import Outbox
+from ratelimit import TokenBucket
+from utils import MockBot
+
+
+def run_queue(outbound, messages=()):
+    async def scenario():
+        task = asyncio.ensure_future(outbound.run())
+        await asyncio.sleep(0)
+        for chat_id, text in messages:
+            outbound.send_message(chat_id, text)
+        outbound.wake()
+        await asyncio.sleep(0)
+        await outbound.join()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.new_event_loop().run_until_complete(scenario())
+
+
+class TestOutbound:
+
+    def test_merge_messages(self):
+        assert merge_messages([('a', 1), ('b', None)]) == [('a\n\nb', [1])]
+        assert merge_messages([('aaa', 1), ('bbb', 2)], limit=5) == [
+            ('aaa', [1]), ('bbb', [2])
+        ]
+
+    def test_coalesces_messages_per_chat(self):
+        bot = MockBot()
+        outbound = OutboundQueue(bot, coalesce_window=0.01, chat_rate=100)
+        run_queue(outbound, [(1, 'first'), (2, 'other'), (1, 'second')])
+        assert sorted(bot.sent) == [(1, 'first\n\nsecond'), (2, 'other')]
+
+    def test_retries_after_throttling(self):
+        bot = MockBot(throttle=2)
+        outbound = OutboundQueue(bot, coalesce_window=0.01, chat_rate=100)
+        run_queue(outbound, [(1, 'text')])
+        assert bot.sent == [(1, 'text')]
+
+    def test_delivers_and_acks_outbox(self, tmp_path):
+        outbox = Outbox(tmp_path / 'outbox.jsonl')
+        outbox.add('k1', 1, 'first')
+        outbox.add('k2', 1, 'second')
+        bot = MockBot()
+        outbound = OutboundQueue(
+            bot, coalesce_window=0.01, chat_rate=100, outbox=outbox
+        )
+        run_queue(outbound)
+        assert bot.sent == [(1, 'first\n\nsecond')]
+        assert outbox.items() == []
+        outbox.close()
+
+    def test_token_bucket(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=1, capacity=2, clock=lambda: now[0])
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 1.0
+        assert not bucket.try_acquire()
+        now[0] = 3.0
+        assert bucket.try_acquire()
@@ -0,0 +1,94 @@
+import homework
+from dedup import DedupCache
+from exceptions import MessageNotSend
+from outbox import Outbox
+from scheduler import FixedScheduler
+
+
+class TestOutbox:
+
+    def test_pending_survive_restart(self, tmp_path):
+        path = tmp_path / 'outbox.jsonl'
+        outbox = Outbox(path)
+        assert outbox.add('k1', 1, 'first')
+        assert outbox.add('k2', 1, 'second')
+        outbox.ack('k1')
+        outbox.close()
+
+        outbox = Outbox(path)
+        assert outbox.items() == [('k2', 1, 'second')]
+        assert not outbox.add('k1', 1, 'first'), (
+            'Доставленное уведомление не должно записываться повторно'
+        )
+        assert not outbox.add('k2', 1, 'second')
+        outbox.close()
+
+    def test_drain_stops_on_failure(self, tmp_path):
+        outbox = Outbox(tmp_path / 'outbox.jsonl')
+        outbox.add('k1', 1, 'first')
+        outbox.add('k2', 1, 'second')
+        sent = []
+
+        def send(chat_id, text):
+            if text == 'second':
+                raise MessageNotSend('Telegram недоступен')
+            sent.append(text)
+
+        assert outbox.drain(send) == 1
+        assert sent == ['first']
+        assert [key for key, _, _ in outbox.items()] == ['k2']
+        assert outbox.drain(lambda chat_id, text: None) == 1
+        outbox.close()
+
+    def test_compact(self, tmp_path):
+        path = tmp_path / 'outbox.jsonl'
+        outbox = Outbox(path, history=1)
+        for number in range(3):
+            outbox.add(f'k{number}', 1, 'text')
+            outbox.ack(f'k{number}')
+        outbox.add('k3', 1, 'text')
+        outbox.compact()
+        outbox.close()
+        assert len(path.read_text().splitlines()) == 2
+        assert Outbox(path).items() == [('k3', 1, 'text')]
+
+    def test_poll_records_transitions(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            homework, 'fetch_api_answer', lambda timestamp, headers, deadline=None: {
+                'homeworks': [{'id': 1, 'homework_name': 'hw',
+                               'status': 'approved', 'date_updated': 'd1'}],
+                'current_date': 10,
+            }
+        )
+        outbox = Outbox(tmp_path / 'outbox.jsonl')
+        last_send = DedupCache()
+        for _ in range(2):
+            homework.poll_homeworks(
+                None, 1, homework.make_headers('token'), 0, last_send,
+                FixedScheduler(), outbox
+            )
+        assert len(outbox.items()) == 1, (
+            'Уведомление должно быть записано в журнал один раз'
+        )
+        message = homework.parse_status(
+            {'homework_name': 'hw', 'status': 'approved'}
+        )
+        assert outbox.items() == [('1:1:approved:d1', 1, message)], (
+            'В журнал должно попасть уведомление о статусе'
+        )
+        outbox.close()
+
+    def test_ack_compacts_long_running_journal(self, tmp_path):
+        path = tmp_path / 'outbox.jsonl'
+        outbox = Outbox(path, history=10)
+        for number in range(2000):
+            outbox.add(f'k{number}', 1, 'text')
+            outbox.ack(f'k{number}')
+        outbox.close()
+        assert len(path.read_text().splitlines()) < 1100, (
+            'Журнал работающего процесса должен сжиматься'
+        )
+        reopened = Outbox(path, history=10)
+        assert reopened.items() == []
+        assert not reopened.add('k1999', 1, 'text')
+        reopened.close()
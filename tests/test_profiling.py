@@ -0,0 +1,57 @@
+import os
+import threading
+
+from profiling import CycleProfiler
+
+
+def busy_cycle():
+    return [str(number) for number in range(1000)]
+
+
+class TestCycleProfiler:
+
+    def test_disabled_profiler_writes_nothing(self, tmp_path):
+        profiler = CycleProfiler(cycles=0, directory=tmp_path / 'profiles')
+        with profiler.cycle():
+            busy_cycle()
+        assert profiler.profile is None
+        assert not os.path.exists(tmp_path / 'profiles')
+
+    def test_signal_profiles_next_cycles(self, tmp_path):
+        profiler = CycleProfiler(
+            cycles=0, signal_cycles=2, directory=tmp_path
+        )
+        profiler.request()
+        with profiler.cycle():
+            busy_cycle()
+        assert os.listdir(tmp_path) == [], (
+            'Результаты записываются после последнего цикла'
+        )
+        with profiler.cycle():
+            busy_cycle()
+        names = sorted(os.listdir(tmp_path))
+        assert len(names) == 3
+        assert names[0].endswith('-allocations.txt')
+        assert names[1].endswith('.pstats')
+        assert 'busy_cycle' in (tmp_path / names[2]).read_text()
+        with profiler.cycle():
+            busy_cycle()
+        assert len(os.listdir(tmp_path)) == 3
+
+    def test_cycles_from_threads_are_profiled_in_turn(self, tmp_path):
+        profiler = CycleProfiler(
+            cycles=0, signal_cycles=4, directory=tmp_path
+        )
+        profiler.request()
+
+        def worker():
+            with profiler.cycle():
+                busy_cycle()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(os.listdir(tmp_path)) == 3
+        assert profiler.profile is None
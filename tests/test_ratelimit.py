@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+import homework
+from breaker import CircuitBreaker
+from exceptions import CircuitOpenError, ServerError
+from ratelimit import NORMAL, URGENT, RateLimiter, SharedTokenBucket
+
+
+class RecordingBucket:
+
+    def __init__(self):
+        self.calls = 0
+
+    def reserve(self, tokens=1):
+        self.calls += 1
+        return 0.2 if self.calls == 1 else 0.0
+
+
+class TestRateLimit:
+
+    def test_shared_bucket_limits_all_processes(self, tmp_path):
+        now = [1000.0]
+        path = str(tmp_path / 'ratelimit.sqlite3')
+        first = SharedTokenBucket(path, 'api', rate=1, capacity=2,
+                                  clock=lambda: now[0])
+        second = SharedTokenBucket(path, 'api', rate=1, capacity=2,
+                                   clock=lambda: now[0])
+        assert first.reserve() == 0
+        assert second.reserve() == 0
+        assert first.reserve() == 1, 'Ведро должно быть общим для процессов'
+        now[0] += 3
+        assert second.reserve() == 0
+        first.close()
+        second.close()
+
+    def test_urgent_requests_go_first(self):
+        limiter = RateLimiter(RecordingBucket())
+        order = []
+
+        def acquire(name, priority):
+            limiter.acquire(priority)
+            order.append(name)
+
+        threads = [threading.Thread(target=acquire, args=('first', NORMAL))]
+        threads[0].start()
+        while not limiter.busy:
+            time.sleep(0.001)
+        for name, priority in (('normal', NORMAL), ('urgent', URGENT)):
+            thread = threading.Thread(target=acquire, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            while len(limiter) < len(threads) - 1:
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join(5)
+        assert order == ['first', 'urgent', 'normal']
+
+    def test_open_circuit_does_not_take_tokens(self, monkeypatch):
+        bucket = RecordingBucket()
+        monkeypatch.setattr(homework, 'api_limiter', RateLimiter(bucket))
+        monkeypatch.setattr(
+            homework, 'practicum_breaker',
+            CircuitBreaker('test', failures=1, reset_timeout=60)
+        )
+
+        def failing(current_timestamp, headers, deadline=None):
+            raise ServerError('down')
+
+        monkeypatch.setattr(homework, 'fetch_api_answer', failing)
+        with pytest.raises(ServerError):
+            homework.fetch_limited(0, {})
+        assert bucket.calls == 1
+        for _ in range(5):
+            with pytest.raises(CircuitOpenError):
+                homework.fetch_limited(0, {})
+        assert bucket.calls == 1, (
+            'При разомкнутой цепи запрос не должен ждать лимита'
+        )
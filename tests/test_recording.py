@@ -0,0 +1,35 @@
+import homework
+import recording
+from utils import MockBot
+
+
+class TestRecording:
+
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.setattr(recording, 'RECORD_FILE', None)
+        recording.record('api', response={})
+        assert recording._file is None
+
+    def test_records_api_answers_and_sends(self, monkeypatch, tmp_path):
+        path = str(tmp_path / 'traffic.jsonl.gz')
+        monkeypatch.setattr(recording, 'RECORD_FILE', path)
+
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return {'homeworks': [], 'current_date': 5}
+
+        monkeypatch.setattr(
+            homework.http_session, 'get', lambda url, **kwargs: Response()
+        )
+        headers = homework.make_headers('secret')
+        homework.fetch_api_answer(1, headers)
+        homework.deliver_message(MockBot(), 7, 'text')
+        recording.close()
+        records = list(recording.read_records(path))
+        assert [record['kind'] for record in records] == ['api', 'send']
+        assert records[0]['response'] == {'homeworks': [], 'current_date': 5}
+        assert records[0]['from_date'] == 1
+        assert 'secret' not in str(records), 'Токен не должен записываться'
+        assert records[1]['chat'] == 7 and records[1]['text'] == 'text'
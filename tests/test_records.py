@@ -0,0 +1,59 @@
+import json
+import sys
+
+import pytest
+
+import homework
+from records import Homework
+
+
+class TestHomework:
+
+    def test_from_dict_keeps_needed_fields(self):
+        data = {
+            'id': 7, 'homework_name': 'hw', 'status': 'approved',
+            'reviewer_comment': 'Всё нравится', 'lesson_name': 'Итоговый',
+            'date_updated': '2022-04-15T10:00:00Z',
+        }
+        record = Homework.from_dict(data)
+        assert record == Homework(7, 'hw', 'approved', '2022-04-15T10:00:00Z')
+        assert record.key == '7'
+        assert record.state == ('approved', '2022-04-15T10:00:00Z')
+        assert not hasattr(record, '__dict__'), (
+            'Запись не должна хранить словарь атрибутов'
+        )
+
+    def test_status_is_interned(self):
+        first, second = (
+            Homework.from_dict(item)
+            for item in json.loads(
+                '[{"homework_name": "a", "status": "reviewing"},'
+                ' {"homework_name": "b", "status": "reviewing"}]'
+            )
+        )
+        assert first.status is second.status
+        assert first.status is sys.intern('reviewing')
+
+    def test_parse_homeworks(self):
+        records = list(homework.parse_homeworks([
+            {'id': 1, 'homework_name': 'hw', 'status': 'rejected'},
+        ]))
+        assert records == [Homework(1, 'hw', 'rejected')]
+        assert homework.parse_status(records[0]) == homework.parse_status(
+            {'id': 1, 'homework_name': 'hw', 'status': 'rejected'}
+        )
+        with pytest.raises(KeyError):
+            list(homework.parse_homeworks([{'homework_name': 'hw'}]))
+
+    def test_all_invalid_homeworks_are_logged(self, caplog):
+        with pytest.raises(KeyError, match='unknown'):
+            list(homework.parse_homeworks([
+                {'homework_name': 'hw', 'status': 'approved'},
+                {'homework_name': 'hw', 'status': 'unknown'},
+                {'status': 'approved'},
+            ]))
+        logged = [record.getMessage() for record in caplog.records]
+        assert any('homeworks[1].status' in line for line in logged)
+        assert any('homeworks[2].homework_name' in line for line in logged), (
+            'Должны логироваться все ошибки ответа, а не только первая'
+        )
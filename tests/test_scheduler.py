@@ -0,0 +1,61 @@
+from exceptions import HTTPRequestError
+from records import Homework
+from scheduler import AdaptiveScheduler, FixedScheduler, parse_retry_after
+
+
+class MockResponse:
+
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class TestScheduler:
+
+    def test_fixed_scheduler(self):
+        scheduler = FixedScheduler(interval=10)
+        scheduler.observe([])
+        assert scheduler.next_delay() == 10
+
+    def test_reviewing_polls_faster(self):
+        scheduler = AdaptiveScheduler(
+            interval=600, reviewing_interval=60, jitter=0
+        )
+        scheduler.observe([Homework(1, 'hw', 'reviewing')])
+        assert scheduler.next_delay() == 60
+        scheduler.observe([])
+        assert scheduler.next_delay() == 60, (
+            'Работа остаётся на ревью, пока не придёт новый статус'
+        )
+        scheduler.observe([Homework(1, 'hw', 'approved')])
+        assert scheduler.next_delay() == 600
+
+    def test_renamed_homework_leaves_review(self):
+        scheduler = AdaptiveScheduler(
+            interval=600, reviewing_interval=60, jitter=0
+        )
+        scheduler.observe([Homework(1, 'hw', 'reviewing')])
+        scheduler.observe([Homework(1, 'hw renamed', 'approved')])
+        assert not scheduler.urgent(), (
+            'Работы на ревью должны различаться по id, а не по названию'
+        )
+        assert scheduler.next_delay() == 600
+
+    def test_backoff_after_errors_and_empty(self):
+        scheduler = AdaptiveScheduler(
+            interval=100, error_interval=10, max_interval=1000, jitter=0
+        )
+        delays = []
+        for _ in range(3):
+            scheduler.observe(error=ValueError())
+            delays.append(scheduler.next_delay())
+        assert delays == [10, 20, 40]
+        for _ in range(5):
+            scheduler.observe([])
+        assert scheduler.next_delay() == 1000
+
+    def test_retry_after(self):
+        assert parse_retry_after(MockResponse({'Retry-After': '30'})) == 30
+        assert parse_retry_after(MockResponse({})) is None
+        scheduler = AdaptiveScheduler(jitter=0)
+        scheduler.observe(error=HTTPRequestError('429', retry_after=45))
+        assert scheduler.next_delay() == 45
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_result(self):
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'homeworks': []}
+
+        results = []
+        leader = threading.Thread(
+            target=lambda: results.append(flights.do('key', fetch))
+        )
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(
+                target=lambda: results.append(flights.do('key', fetch))
+            )
+            for _ in range(3)
+        ]
+        for thread in followers:
+            thread.start()
+        while flights.shared < 3:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [
+            False, True, True, True
+        ]
+        assert len(flights) == 0
+
+    def test_finished_result_is_not_reused(self):
+        flights = SingleFlight()
+        assert flights.do('key', lambda: 1) == (1, False)
+        assert flights.do('key', lambda: 2) == (2, False), (
+            'Повторный опрос после завершения вызова должен делать '
+            'новый запрос'
+        )
+
+    def test_errors_are_not_remembered(self):
+        flights = SingleFlight()
+
+        def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            flights.do('key', fail)
+        assert flights.do('key', lambda: 1) == (1, False)
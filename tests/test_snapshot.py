@@ -0,0 +1,44 @@
+import json
+
+from dedup import DedupCache
+from records import Homework
+from snapshot import transitions
+
+
+class TestSnapshot:
+
+    def test_only_transitions_are_emitted(self):
+        snapshot = DedupCache()
+        homeworks = [
+            Homework(1, 'hw', 'reviewing', '2022-01-01T10:00:00Z'),
+        ]
+        changed = list(transitions(snapshot, homeworks))
+        assert len(changed) == 1
+        for key, state, _ in changed:
+            snapshot.remember(key, state)
+        assert list(transitions(snapshot, homeworks)) == []
+
+        homeworks[0] = Homework(1, 'hw', 'approved', '2022-01-02T10:00:00Z')
+        assert [key for key, _, _ in transitions(snapshot, homeworks)] == ['1']
+
+    def test_duplicate_and_renamed_homeworks(self):
+        snapshot = DedupCache()
+        snapshot.remember('1', ('reviewing', 'd1'))
+        homeworks = [
+            Homework(1, 'renamed', 'reviewing', 'd1'),
+            Homework(2, 'renamed', 'reviewing', 'd1'),
+        ]
+        changed = list(transitions(snapshot, homeworks))
+        assert [key for key, _, _ in changed] == ['2'], (
+            'Работы должны различаться по id, а не по названию'
+        )
+
+    def test_snapshot_survives_json_roundtrip(self):
+        snapshot = DedupCache()
+        snapshot.remember('1', ('approved', 'd1'))
+        snapshot = DedupCache(json.loads(json.dumps(snapshot)))
+        homework = Homework(1, 'hw', 'approved', 'd1')
+        assert list(transitions(snapshot, [homework])) == []
+
+    def test_key_without_id(self):
+        assert Homework(None, 'hw', 'approved').key == 'name:hw'
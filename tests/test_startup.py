@@ -0,0 +1,49 @@
+import io
+import os
+import subprocess
+import sys
+
+import http_session
+from lazy import Deferred
+from startup import import_costs, profile_startup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStartup:
+
+    def test_heavy_clients_not_imported(self):
+        result = subprocess.run(
+            [sys.executable, '-c',
+             'import sys, homework; '
+             'print("telegram.bot" in sys.modules, '
+             '"requests.sessions" in sys.modules)'],
+            capture_output=True, text=True, cwd=ROOT
+        )
+        assert result.stdout.split() == ['False', 'False'], (
+            'telegram и requests должны загружаться при первом обращении'
+        )
+
+    def test_deferred_builds_client_once(self):
+        created = []
+
+        class Client:
+            def ping(self):
+                return 'pong'
+
+        client = Deferred(lambda: created.append(1) or Client())
+        assert created == []
+        assert client.ping() == 'pong'
+        assert client.ping() == 'pong'
+        assert created == [1]
+
+    def test_profile_startup_report(self):
+        assert 'validator' in dict(import_costs('validator'))
+        output = io.StringIO()
+        profile_startup('validator', file=output)
+        text = output.getvalue()
+        assert 'Import costs of validator' in text
+        assert 'telegram import and Bot' in text
+        assert http_session._session is None, (
+            'Замер не должен оставлять настроенную общую сессию'
+        )
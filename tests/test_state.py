@@ -0,0 +1,32 @@
+from state import StateStore, subscription_key
+
+
+class TestStateStore:
+
+    def test_state_survives_restart(self, tmp_path):
+        path = tmp_path / 'state.sqlite3'
+        key = subscription_key('token', 123)
+        store = StateStore(path, commit_interval=60)
+        store.save(key, 1000, {'error': 17, 'hw': 42})
+        assert store.load(key)[:2] == (1000, {'error': 17, 'hw': 42}), (
+            'Несохранённые изменения должны читаться из памяти'
+        )
+        store.close()
+
+        store = StateStore(path)
+        assert store.load(key)[0] == 1000
+        assert store.load_all()[key][1]['hw'] == 42
+        assert store.load('missing') is None
+        store.close()
+
+    def test_batch_commit(self, tmp_path):
+        store = StateStore(tmp_path / 'state.sqlite3', commit_interval=60,
+                           batch_size=2)
+        store.save('a', 1, {})
+        assert store.pending
+        store.save('b', 2, {})
+        assert not store.pending
+        store.close()
+
+    def test_key_hides_token(self):
+        assert 'secret' not in subscription_key('secret', 1)
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+import homework
+from dedup import DedupCache
+from scheduler import FixedScheduler
+from streaming import HomeworkStream
+from utils import MockBot
+from watermark import WATERMARK_OVERLAP
+
+
+def chunked(data, size=7):
+    raw = json.dumps(data, ensure_ascii=False).encode()
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+class TestHomeworkStream:
+
+    def test_yields_homeworks_one_by_one(self):
+        data = {
+            'current_date': 1234567890,
+            'homeworks': [
+                {'id': i, 'homework_name': f'работа {i}', 'status': 'approved'}
+                for i in range(50)
+            ],
+        }
+        stream = HomeworkStream(chunked(data))
+        largest = 0
+        names = []
+        for record in stream:
+            names.append(record['homework_name'])
+            largest = max(largest, len(stream.buffer))
+        assert names == [f'работа {i}' for i in range(50)]
+        assert len(stream) == 50
+        assert stream.get('current_date') == 1234567890
+        assert largest < 200, 'Буфер не должен расти вместе с ответом'
+
+    @pytest.mark.parametrize('data, error', [
+        ({}, KeyError),
+        ([{'homeworks': []}], TypeError),
+        ({'current_date': 1}, KeyError),
+        ({'homeworks': {'homework_name': 'hw'}}, TypeError),
+    ])
+    def test_check_response_semantics(self, data, error):
+        with pytest.raises(error):
+            list(homework.check_response(HomeworkStream(chunked(data))))
+
+    def test_trailing_number_is_not_truncated(self):
+        stream = HomeworkStream([b'{"homeworks": [], "current_date": 12',
+                                 b'34}'])
+        assert list(stream) == []
+        assert stream.get('current_date') == 1234
+
+    def test_poll_reads_stream_lazily(self, monkeypatch):
+        data = {
+            'current_date': 5000,
+            'homeworks': [
+                {'id': i, 'homework_name': f'работа {i}', 'status': 'approved'}
+                for i in range(20)
+            ],
+        }
+        stream = HomeworkStream(chunked(data))
+        monkeypatch.setattr(homework, 'fetch_shared', lambda *args: stream)
+        bot = MockBot()
+        read = []
+        bot.send_message = lambda chat_id, text: read.append(stream.count)
+        last_send = DedupCache()
+        timestamp = homework.poll_homeworks(
+            bot, 1, {}, 0, last_send, FixedScheduler()
+        )
+        assert read == list(range(1, 21)), (
+            'Уведомление должно уходить до чтения следующих работ'
+        )
+        assert timestamp == 5000 - WATERMARK_OVERLAP
+        assert len(last_send) == 20
+
+    def test_poll_empty_stream(self, monkeypatch):
+        stream = HomeworkStream(chunked({'homeworks': [], 'current_date': 9}))
+        monkeypatch.setattr(homework, 'fetch_shared', lambda *args: stream)
+        bot = MockBot()
+        homework.poll_homeworks(bot, 1, {}, 0, DedupCache(), FixedScheduler())
+        assert bot.sent == [], 'Пустой ответ не должен вызывать сообщений'
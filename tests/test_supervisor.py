@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import signal
+import time
+
+import supervisor
+from engine import Subscription
+from lifecycle import GracefulShutdown
+from outbox import Outbox
+
+
+def crash(index, workers):
+    os._exit(3)
+
+
+def wait_for_signal(index, workers):
+    signal.signal(signal.SIGUSR1, lambda *args: os._exit(5))
+    ready.set()
+    time.sleep(10)
+    os._exit(0)
+
+
+ready = multiprocessing.get_context('fork').Event()
+
+
+class TestSupervisor:
+
+    def test_ring_moves_few_keys(self):
+        keys = [f'chat-{number}' for number in range(2000)]
+        before = supervisor.HashRing(range(4))
+        after = supervisor.HashRing(range(5))
+        moved = sum(
+            before.node_for(key) != after.node_for(key) for key in keys
+        )
+        assert moved < len(keys) * 0.3, (
+            'При добавлении воркера должна переезжать малая часть подписок'
+        )
+        counts = [
+            sum(after.node_for(key) == node for key in keys)
+            for node in range(5)
+        ]
+        assert min(counts) > len(keys) / 5 * 0.6
+
+    def test_shard_covers_all_subscriptions(self):
+        subscriptions = [
+            Subscription(f'token{number}', number) for number in range(50)
+        ]
+        shards = supervisor.shard(subscriptions, 3)
+        assert sorted(shards) == [0, 1, 2]
+        assert sorted(
+            s.chat_id for shard in shards.values() for s in shard
+        ) == list(range(50))
+
+    def test_same_token_lands_in_one_worker(self):
+        subscriptions = [
+            Subscription(f'token{number % 10}', number)
+            for number in range(50)
+        ]
+        shards = supervisor.shard(subscriptions, 4)
+        owners = {}
+        for index, shard in shards.items():
+            for subscription in shard:
+                owners.setdefault(subscription.token, set()).add(index)
+        assert all(len(workers) == 1 for workers in owners.values()), (
+            'Чаты одного токена должны опрашиваться одним воркером'
+        )
+
+    def test_adopt_orphans(self, tmp_path):
+        path = str(tmp_path / 'outbox.jsonl')
+        orphan = Outbox(supervisor.worker_path(path, 3))
+        orphan.add('key', 1, 'text')
+        orphan.close()
+        supervisor.adopt_orphans(2, path)
+        assert not os.path.exists(supervisor.worker_path(path, 3))
+        adopted = Outbox(supervisor.worker_path(path, 1))
+        assert adopted.items() == [('key', 1, 'text')]
+        adopted.close()
+
+    def test_crashed_worker_is_restarted(self, monkeypatch):
+        monkeypatch.setattr(supervisor, 'RESTART_DELAY', 0)
+        pool = supervisor.Supervisor(
+            workers=1, target=crash,
+            context=multiprocessing.get_context('fork'),
+            shutdown=GracefulShutdown(timeout=1)
+        )
+        pool.start(0)
+        first = pool.processes[0]
+        first.join(5)
+        deadline = time.monotonic() + 5
+        while pool.processes[0] is first and time.monotonic() < deadline:
+            pool.check()
+        assert pool.processes[0] is not first
+        assert first.exitcode == 3
+        pool.stop()
+
+    def test_sigusr1_is_forwarded_to_workers(self):
+        pool = supervisor.Supervisor(
+            workers=1, target=wait_for_signal,
+            context=multiprocessing.get_context('fork'),
+            shutdown=GracefulShutdown(timeout=1)
+        )
+        pool.start(0)
+        assert ready.wait(5)
+        pool.forward(signal.SIGUSR1)
+        pool.processes[0].join(5)
+        assert pool.processes[0].exitcode == 5, (
+            'SIGUSR1 супервизора должен доходить до воркеров'
+        )
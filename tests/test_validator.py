@@ -0,0 +1,62 @@
+import pytest
+
+import homework
+from validator import compile_schema
+
+
+class TestValidator:
+
+    def test_collects_all_errors(self):
+        response = {
+            'current_date': 1,
+            'homeworks': [
+                {'homework_name': 'ok', 'status': 'approved'},
+                {'status': 'approved'},
+                {'homework_name': 'hw', 'status': 'unknown'},
+                'not a dict',
+            ],
+        }
+        errors = homework.validate_response(response)
+        assert [(error.path, error.error) for error in errors] == [
+            ('.homeworks[1].homework_name', KeyError),
+            ('.homeworks[2].status', KeyError),
+            ('.homeworks[3]', TypeError),
+        ]
+
+    def test_valid_response(self):
+        response = {
+            'current_date': 1,
+            'homeworks': [{'homework_name': 'hw', 'status': 'reviewing'}],
+        }
+        assert homework.validate_response(response) == []
+
+    @pytest.mark.parametrize('response, error', [
+        ({}, KeyError),
+        ([1], TypeError),
+        ({'current_date': 1}, KeyError),
+        ({'homeworks': {}}, TypeError),
+    ])
+    def test_check_response_exceptions(self, response, error):
+        with pytest.raises(error):
+            homework.check_response(response)
+
+    @pytest.mark.parametrize('current_date', [None, 1.5, '1', -1])
+    def test_current_date_is_left_to_watermark(self, current_date):
+        response = {'homeworks': [], 'current_date': current_date}
+        assert homework.check_response(response) == []
+
+    @pytest.mark.parametrize('status', [None, 1, ['approved']])
+    def test_wrong_status_raises_key_error(self, status):
+        with pytest.raises(KeyError):
+            homework.parse_status({'homework_name': 'hw', 'status': status})
+
+    def test_optional_keys_and_unhashable_values(self):
+        validate = compile_schema({
+            'type': dict,
+            'keys': {'tag': {'type': str, 'choices': ['a'],
+                             'required': False}},
+        })
+        errors = []
+        assert validate({}, errors)
+        assert not validate({'tag': ['a']}, errors)
+        assert errors[0].error is TypeError
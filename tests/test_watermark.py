@@ -0,0 +1,29 @@
+from dedup import DedupCache
+from records import Homework
+from snapshot import transitions
+from watermark import advance
+
+
+class TestWatermark:
+
+    def test_overlap_and_monotonicity(self):
+        assert advance(0, 1000, overlap=60) == 940
+        assert advance(940, 1030, overlap=60) == 970
+        assert advance(970, 900, overlap=60) == 970, (
+            'Метка не должна уменьшаться'
+        )
+
+    def test_missing_current_date_keeps_watermark(self):
+        assert advance(970, None) == 970, (
+            'Без current_date метка не должна становиться None'
+        )
+        assert advance(970, '1000') == 970
+
+    def test_overlap_does_not_repeat_notifications(self):
+        snapshot = DedupCache()
+        homework = Homework(1, 'hw', 'approved', '2022-01-01T10:00:00Z')
+        for key, state, _ in transitions(snapshot, [homework]):
+            snapshot.remember(key, state)
+        assert list(transitions(snapshot, [homework])) == [], (
+            'Работа из окна перекрытия не должна отправляться повторно'
+        )
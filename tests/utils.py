@@ -37,3 +37,18 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
         f'{var_name} должна быть переменной, а не функцией.'
     )
 
+
+class MockBot:
+    """Telegram bot stand-in that remembers sent messages"""
+
+    def __init__(self, throttle=0):
+        self.sent = []
+        self.throttle = throttle
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.throttle:
+            from telegram.error import RetryAfter
+
+            self.throttle -= 1
+            raise RetryAfter(0)
+        self.sent.append((chat_id, text))
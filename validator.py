@@ -0,0 +1,188 @@
+from collections import namedtuple
+
+ValidationError = namedtuple('ValidationError', 'path error message')
+ValidationError.__doc__ = 'Ошибка проверки: путь, класс исключения, текст.'
+
+
+def raise_for_errors(errors):
+    """Поднимает исключение первой из найденных ошибок."""
+    if errors:
+        first = errors[0]
+        raise first.error(first.message)
+
+
+def _prefixed(errors, start, prefix):
+    for number in range(start, len(errors)):
+        path, error, message = errors[number]
+        errors[number] = ValidationError(f'{prefix}{path}', error, message)
+
+
+class _Generator:
+    """Генерирует исходный код быстрой проверки по схеме."""
+
+    def __init__(self):
+        self.namespace = {}
+        self.functions = []
+
+    def constant(self, value):
+        name = f'_c{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def expression(self, schema, var):
+        parts = []
+        if schema.get('non_empty', False):
+            parts.append(var)
+        if schema['type'] is not object:
+            parts.append(f'isinstance({var}, {self.constant(schema["type"])})')
+        if 'choices' in schema:
+            choices = self.constant(frozenset(schema['choices']))
+            parts.append(f'{var} in {choices}')
+        for key, subschema in schema.get('keys', {}).items():
+            if self.implied_by_choices(subschema):
+                choices = self.constant(frozenset(subschema['choices']))
+                parts.append(f'{var}.get({key!r}) in {choices}')
+                continue
+            item = f'{var}[{key!r}]'
+            nested = self.expression(subschema, item)
+            if subschema.get('required', True):
+                parts.append(f'{key!r} in {var}')
+                if nested != 'True':
+                    parts.append(nested)
+            elif nested != 'True':
+                parts.append(f'({key!r} not in {var} or {nested})')
+        if 'items' in schema:
+            parts.append(f'{self.items(schema["items"])}({var})')
+        return ' and '.join(parts) or 'True'
+
+    @staticmethod
+    def implied_by_choices(schema):
+        """Проверяет, что одно вхождение в choices заменяет все проверки."""
+        choices = schema.get('choices')
+        return (
+            choices is not None
+            and schema.get('required', True)
+            and None not in choices
+            and set(schema) <= {'type', 'choices', 'required'}
+            and all(isinstance(choice, schema['type']) for choice in choices)
+        )
+
+    def items(self, schema):
+        index = len(self.functions)
+        name = f'_items{index}'
+        self.functions.append('')
+        condition = self.expression(schema, 'item')
+        self.functions[index] = (
+            f'def {name}(sequence):\n'
+            f'    for item in sequence:\n'
+            f'        if not ({condition}):\n'
+            f'            return False\n'
+            f'    return True\n'
+        )
+        return name
+
+    def build(self, schema):
+        body = self.expression(schema, 'value')
+        source = '\n'.join(self.functions) + (
+            f'\ndef check(value):\n    return bool({body})\n'
+        )
+        exec(compile(source, '<schema>', 'exec'), self.namespace)
+        return self.namespace['check']
+
+
+def compile_schema(schema, name='response'):
+    """Компилирует схему в функцию проверки validate(value, errors).
+
+    Схема — словарь с ключами `type`, `non_empty`, `keys` (вложенные
+    схемы по ключам словаря, `required` по умолчанию True), `items`
+    (схема элементов списка) и `choices` (допустимые значения).
+    Функция дописывает найденные ошибки в `errors` и возвращает True,
+    если значение корректно.
+
+    По схеме один раз генерируется и компилируется выражение быстрой
+    проверки; подробный разбор с поиском всех ошибок запускается,
+    только если быстрая проверка не прошла.
+    """
+    check = _Generator().build(schema)
+    detailed = _detailed(schema, name)
+
+    def validate(value, errors):
+        try:
+            if check(value):
+                return True
+        except TypeError:
+            pass
+        return detailed(value, errors)
+
+    return validate
+
+
+def _check_keys(value, keys, errors):
+    valid = True
+    for key, check, required in keys:
+        if key not in value:
+            if required:
+                errors.append(ValidationError(
+                    f'.{key}', KeyError, f'Missing key {key}.'
+                ))
+                valid = False
+            continue
+        start = len(errors)
+        if not check(value[key], errors):
+            _prefixed(errors, start, f'.{key}')
+            valid = False
+    return valid
+
+
+def _check_items(value, items, errors):
+    valid = True
+    for index, item in enumerate(value):
+        start = len(errors)
+        if not items(item, errors):
+            _prefixed(errors, start, f'[{index}]')
+            valid = False
+    return valid
+
+
+def _among(value, choices):
+    try:
+        return value in choices
+    except TypeError:
+        return False
+
+
+def _detailed(schema, name):
+    expected = schema['type']
+    type_name = expected.__name__
+    non_empty = schema.get('non_empty', False)
+    choices = frozenset(schema['choices']) if 'choices' in schema else None
+    keys = tuple(
+        (key, _detailed(subschema, key), subschema.get('required', True))
+        for key, subschema in schema.get('keys', {}).items()
+    )
+    items = _detailed(schema['items'], name) if 'items' in schema else None
+
+    def validate(value, errors):
+        if non_empty and not value:
+            errors.append(ValidationError(
+                '', KeyError, f'Empty {"dictionary" if keys else type_name}'
+            ))
+            return False
+        if not isinstance(value, expected):
+            errors.append(ValidationError(
+                '', TypeError,
+                f'Wrong type {name}.'
+                f'Should have come {type_name} but came {type(value)}'
+            ))
+            return False
+        if choices is not None and not _among(value, choices):
+            errors.append(ValidationError(
+                '', KeyError, f'{value} not among the possible'
+            ))
+            return False
+        valid = _check_keys(value, keys, errors)
+        if items is not None:
+            valid = _check_items(value, items, errors) and valid
+        return valid
+
+    return validate
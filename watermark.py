@@ -0,0 +1,31 @@
+import logging
+import os
+
+WATERMARK_OVERLAP = int(os.getenv('WATERMARK_OVERLAP', 60))
+
+
+def advance(from_date, current_date, overlap=WATERMARK_OVERLAP):
+    """Возвращает from_date для следующего запроса к API.
+
+    Метка сдвигается к `current_date` ответа за вычетом `overlap`
+    секунд, чтобы не потерять работы, обновлённые на границе
+    интервала. Повторно полученные работы отсеивает
+    `snapshot.transitions` по id и состоянию с `date_updated`.
+    Метка никогда не уменьшается: если `current_date` нет в ответе,
+    оно не целое или меньше предыдущего, остаётся прежняя метка.
+    """
+    if type(current_date) is not int:
+        logging.warning(
+            f'API response has invalid current_date {current_date!r}, '
+            f'keeping from_date {from_date}'
+        )
+        return from_date
+    candidate = current_date - overlap
+    if candidate < from_date:
+        if current_date < from_date:
+            logging.warning(
+                f'API current_date {current_date} went back from '
+                f'from_date {from_date}, keeping it'
+            )
+        return from_date
+    return candidate